@@ -0,0 +1,250 @@
+import bisect
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from export import snowflake_time
+
+OPEN_WINDOW = timedelta(hours=24)  # "Now", "anytime" and friends
+SINGLE_TIME_WINDOW = timedelta(hours=2)  # "5pm" means they can start any time in the next two hours
+
+# Standard-time offsets; trainees rarely write the daylight variant correctly anyway
+TIMEZONES = {
+    "UTC": 0, "GMT": 0, "BST": 1, "CET": 1, "CEST": 2,
+    "EST": -5, "EDT": -4, "ET": -5,
+    "CST": -6, "CDT": -5, "CT": -6,
+    "MST": -7, "MDT": -6, "MT": -7,
+    "PST": -8, "PDT": -7, "PT": -8
+}
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_OPEN_WORDS = re.compile(r"\b(now|asap|any\s*time|whenever|free)\b")
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+_RANGE = re.compile(rf"{_TIME}\s*(?:-|–|to|until|till)\s*{_TIME}")
+_SINGLE = re.compile(rf"(?<![\d:]){_TIME}(?![\d:])")
+_RELATIVE = re.compile(r"\bin\s+(\d+)\s*(h|hrs?|hours?|m|mins?|minutes?)\b")
+_AFTER = re.compile(rf"\b(?:after|from)\s*{_TIME}")
+_UNTIL = re.compile(rf"\b(?:until|till|to)\s*{_TIME}")
+_ZONE = re.compile(r"\b(" + "|".join(TIMEZONES) + r")\b", re.IGNORECASE)
+
+
+def _hour(hour, minute, meridiem):
+    hour = int(hour)
+    # "at 2" could be 2am or 2pm; only "2pm", "14" or "14:00" say which
+    if meridiem is None and minute is None and hour <= 12:
+        return None
+    minute = int(minute or 0)
+    if hour > 23 or minute > 59 or (meridiem and not 1 <= hour <= 12):
+        return None
+    if meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    return timedelta(hours=hour, minutes=minute)
+
+
+def parse_availability(text, reference):
+    """Turn free-text availability into a ``(start, end)`` pair of UTC timestamps, or None.
+
+    ``reference`` is when the request was made. Understands a range ("3-5pm",
+    "from 7 to 9pm EST", "18:00 to 20:00 UTC"), "after 6pm", "now until 9pm",
+    "in 2 hours", a single time ("5pm"), and an optional "today"/"tomorrow"/weekday,
+    in that order; "now"/"anytime" with no time at all is the fallback. A bare
+    hour with no am/pm is ambiguous and gives None. Times already past roll
+    over to the next day unless a day was given.
+    """
+    text = text.strip().lower()
+    zone = _ZONE.search(text)
+    tz = timezone(timedelta(hours=TIMEZONES[zone.group(1).upper()])) if zone else timezone.utc
+    now = datetime.fromtimestamp(reference, tz)
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    explicit_day = True
+    if "tomorrow" in text:
+        day += timedelta(days=1)
+    elif any(name in text for name in WEEKDAYS):
+        weekday = next(index for index, name in enumerate(WEEKDAYS) if name in text)
+        day += timedelta(days=(weekday - now.weekday()) % 7)
+    else:
+        explicit_day = "today" in text
+
+    relative = _RELATIVE.search(text)
+    if relative:
+        amount = int(relative.group(1))
+        start = now + (timedelta(hours=amount) if relative.group(2).startswith("h") else timedelta(minutes=amount))
+        return start.timestamp(), (start + SINGLE_TIME_WINDOW).timestamp()
+
+    range_match, after, until = _RANGE.search(text), _AFTER.search(text), _UNTIL.search(text)
+    if range_match:
+        start_hour, start_minute, start_meridiem, end_hour, end_minute, end_meridiem = range_match.groups()
+        # "3-5pm" means 3pm
+        if start_meridiem is None and end_meridiem is not None:
+            start_meridiem = end_meridiem
+            if int(start_hour) > int(end_hour) and int(start_hour) != 12:
+                # ...but "11-1pm" means 11am
+                start_meridiem = "am" if end_meridiem == "pm" else "pm"
+        start = _hour(start_hour, start_minute, start_meridiem)
+        end = _hour(end_hour, end_minute, end_meridiem)
+        if start is None or end is None:
+            return None
+        start, end = day + start, day + end
+        if end <= start:
+            end += timedelta(days=1)
+    elif after or until:
+        offset = _hour(*(after or until).groups())
+        if offset is None:
+            return None
+        if after:
+            # Open-ended, so assume the rest of that day
+            start = day + offset
+            end = max(day + timedelta(days=1), start + SINGLE_TIME_WINDOW)
+        else:
+            # "Now until 9pm"
+            start, end = max(now, day), day + offset
+            if end <= now and not explicit_day:
+                end += timedelta(days=1)
+            return start.timestamp(), max(start, end).timestamp()
+    elif _SINGLE.search(text):
+        start = _hour(*_SINGLE.search(text).groups())
+        if start is None:
+            return None
+        start = day + start
+        end = start + SINGLE_TIME_WINDOW
+    elif explicit_day:
+        # "free saturday": any time that day
+        start, end = max(now, day), day + timedelta(days=1)
+    elif _OPEN_WORDS.search(text):
+        return reference, (now + OPEN_WINDOW).timestamp()
+    else:
+        return None
+
+    if end <= now and not explicit_day:
+        start += timedelta(days=1)
+        end += timedelta(days=1)
+    return start.timestamp(), end.timestamp()
+
+
+@dataclass
+class Session:
+    start: float
+    training_type: str
+    training_ids: list = field(default_factory=list)
+    end: float = None  # start plus the session length
+
+
+def plan_sessions(windows, duration, capacity=None):
+    """Group trainees into as few sessions of ``duration`` seconds as possible.
+
+    ``windows`` is an iterable of ``(training_id, training_type, start, end)``;
+    a trainee only joins a session that fits entirely inside their window, and
+    windows shorter than ``duration`` are left out. Trainings of different
+    types never share a session. Within a type this is the greedy
+    interval-stabbing sweep: sorted by the latest time each trainee could
+    start, a new session is opened at the first trainee's latest start and
+    takes every later trainee who is already available by then. Without a
+    capacity the session count is the minimum possible.
+    """
+    sessions = []
+    open_sessions = {}  # training type -> (session, latest start that still suits every member)
+    # Already in this order when it comes from a ``WindowIndex`` keyed on the end, which makes the sort linear
+    for training_id, training_type, start, end in sorted(windows, key=lambda window: (window[3], window[2])):
+        latest = end - duration
+        if start > latest:
+            continue
+        session, session_latest = open_sessions.get(training_type, (None, None))
+        if session is None or start > session_latest or (capacity and len(session.training_ids) >= capacity):
+            session, session_latest = Session(start, training_type), latest
+            open_sessions[training_type] = session, session_latest
+            sessions.append(session)
+        # Run it as early as everyone in it is free
+        session.start = max(session.start, start)
+        session.end = session.start + duration
+        session.training_ids.append(training_id)
+    sessions.sort(key=lambda session: session.start)
+    return sessions
+
+
+def record_window(record):
+    """A request's ``(start, end)``, parsed from its text for requests older than ``available_window``."""
+    if "available_window" in record:
+        return record["available_window"]
+    # "Now" or "5pm" is relative to when the request message was posted
+    reference = snowflake_time(record["message_id"]) if record.get("message_id") else time.time()
+    return parse_availability(record.get("available_time", ""), reference)
+
+
+class WindowIndex:
+    """Requests kept sorted by their availability window, updated as they come and go.
+
+    ``key`` turns a ``(start, end)`` window into the sort key. Requests whose
+    availability couldn't be read are kept aside in ``unparsed``, or dropped
+    without ``keep_unparsed``.
+    """
+
+    def __init__(self, key, keep_unparsed=True):
+        self.key = key
+        self.keep_unparsed = keep_unparsed
+        self.unparsed = {}
+        self._keys = []
+        self._ids = []
+        self._entries = {}  # training_id -> (key, record, window)
+
+    @classmethod
+    def build(cls, key, records, keep_unparsed=True):
+        """An index of ``(training_id, record)`` pairs, sorted once rather than inserted one by one."""
+        index = cls(key, keep_unparsed)
+        ordered = []
+        for training_id, record in records:
+            window = record_window(record)
+            if window is None:
+                if keep_unparsed:
+                    index.unparsed[training_id] = record
+                continue
+            entry = index._entries[training_id] = (key(window), record, window)
+            ordered.append((entry[0], training_id))
+        ordered.sort(key=lambda item: item[0])
+        index._keys = [item[0] for item in ordered]
+        index._ids = [item[1] for item in ordered]
+        return index
+
+    def add(self, training_id, record, window=None):
+        self.discard(training_id)
+        window = window or record_window(record)
+        if window is None:
+            if self.keep_unparsed:
+                self.unparsed[training_id] = record
+            return
+        key = self.key(window)
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._ids.insert(position, training_id)
+        self._entries[training_id] = (key, record, window)
+
+    def discard(self, training_id):
+        self.unparsed.pop(training_id, None)
+        entry = self._entries.pop(training_id, None)
+        if entry is None:
+            return
+        low = bisect.bisect_left(self._keys, entry[0])
+        position = self._ids.index(training_id, low, bisect.bisect_right(self._keys, entry[0]))
+        del self._keys[position]
+        del self._ids[position]
+
+    def __contains__(self, training_id):
+        return training_id in self._entries or training_id in self.unparsed
+
+    def __len__(self):
+        return len(self._entries) + len(self.unparsed)
+
+    def position(self, key):
+        """How many entries sort before ``key``."""
+        return bisect.bisect_left(self._keys, key)
+
+    def items(self, since=None, until=None):
+        """Yield ``(training_id, record, window)`` with ``since <= key < until``, in key order."""
+        start = self.position(since) if since is not None else 0
+        stop = self.position(until) if until is not None else len(self._keys)
+        for training_id in self._ids[start:stop]:
+            _, record, window = self._entries[training_id]
+            yield training_id, record, window
@@ -0,0 +1,108 @@
+import itertools
+
+_ids = itertools.count(10**17)
+
+
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeMessage:
+    def __init__(self, channel, author=None, content=""):
+        self.id = next(_ids)
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.guild = channel.guild
+
+    async def delete(self):
+        pass
+
+    async def edit(self, **kwargs):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, channel_id, guild=None):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeMessage(self, content=content)
+
+
+class FakeMember:
+    def __init__(self, user_id, role_ids=(), bot=False):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.roles = [FakeRole(role_id) for role_id in role_ids]
+        self.bot = bot
+        self.display_avatar = FakeAsset()
+        self.dm_channel = FakeChannel(user_id)
+
+    async def send(self, content=None, **kwargs):
+        return await self.dm_channel.send(content, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+        self.channels = {}
+        self.members = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id, self))
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    async def fetch_member(self, user_id):
+        return self.members.setdefault(user_id, FakeMember(user_id))
+
+
+class FakeResponse:
+    def __init__(self):
+        self.done = False
+
+    async def send_message(self, content=None, **kwargs):
+        self.done = True
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+    async def edit_message(self, **kwargs):
+        self.done = True
+
+    def is_done(self):
+        return self.done
+
+
+class FakeFollowup:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeInteraction:
+    """Just enough of ``discord.Interaction`` for the slash command handlers, with no network."""
+
+    def __init__(self, user, guild, channel):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel = channel
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(channel)
@@ -0,0 +1,166 @@
+"""Benchmark the slash command handlers against fake Discord objects.
+
+Run from the repository root::
+
+    python -m benchmarks.run --sizes 10000 100000 1000000 --backend json
+
+Each size seeds a fresh store in a temporary directory and reports p50/p99
+latency and ops/sec per command.
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeChannel, FakeGuild, FakeInteraction, FakeMember, FakeMessage
+from availability import WindowIndex, parse_availability
+from export import DISCORD_EPOCH_MS
+from ids import DST_PREFIX
+from storage import TrainingStore
+
+OTHER_CHANNEL_ID = 42
+
+_user_ids = itertools.count(10**9)
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+AVAILABILITY = ("Now", "5pm EST", "3-5pm", "tomorrow 10am", "18:00 to 20:00 UTC", "whenever")
+
+
+def seed_records(count):
+    # Message IDs are snowflakes from the current time, so availability is relative to now
+    now = time.time()
+    snowflake = (int(now * 1000) - DISCORD_EPOCH_MS) << 22
+    windows = [parse_availability(text, now) for text in AVAILABILITY]
+    for n in range(1, count + 1):
+        user_id = str(10**6 + n)
+        yield f"LASD-DST{n:03d}", {
+            "username": f"user{user_id}",
+            "user_id": user_id,
+            "training_type": "DST",
+            "available_time": AVAILABILITY[n % len(AVAILABILITY)],
+            "available_window": windows[n % len(AVAILABILITY)],
+            "group_status": n % 10 != 0,
+            "accepted": False,
+            "message_id": snowflake + n
+        }
+
+
+async def seed_store(state, count):
+    records = dict(seed_records(count))
+    if isinstance(state.store, TrainingStore):
+        state.store.records = records
+    else:
+        await state.store.put_many(records.items())
+    state.pending = WindowIndex.build(state.pending.key, state.store.load_records(accepted=False).items())
+    state.ids.counters[DST_PREFIX] = count
+
+    # Top the results log up to ``count`` rows: 50 hosts, about five results per trainee
+    for n in range(len(state.results), count):
+        state.results._insert({
+            "trainee": f"trainee{n // 5}",
+            "host_id": n % 50,
+            "training_type": "DST" if n % 3 else "EVOC",
+            "passed": n % 4 != 0,
+            "score": "8/10",
+            "notes": "",
+            "logged_at": 1.7e9 + n
+        })
+
+
+async def time_calls(make_call, iterations):
+    samples = []
+    start = time.perf_counter()
+    for n in range(iterations):
+        call = make_call(n)
+        call_start = time.perf_counter()
+        await call
+        samples.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    return samples, iterations / elapsed if elapsed else float("inf")
+
+
+async def bench_size(main, size, iterations):
+    guild = FakeGuild()
+    main.guild_states.open_all(guild_ids=[guild.id])
+    state = main.guild_states.get(guild.id)
+    config = state.config
+    await seed_store(state, size)
+    channel = FakeChannel(OTHER_CHANNEL_ID, guild)
+    training_channel = guild.get_channel(config.training_channel_id)
+    def member(*role_ids):
+        # Fresh user per call so the submission cooldown never short-circuits a handler
+        return FakeMember(next(_user_ids), role_ids)
+
+    def interaction(user):
+        return FakeInteraction(user, guild, channel)
+
+    accept_ids = [f"LASD-DST{n:03d}" for n in range(1, min(size, iterations) + 1)]
+    cases = {
+        "training": lambda n: main.training.callback(interaction(member(config.dst_role_id)), "Now", True),
+        "training_evoc": lambda n: main.training_evoc.callback(interaction(member(*config.master_deputy_role_ids)), "Now"),
+        "training_accept": lambda n: main.training_accept.callback(interaction(member(config.staff_role_id)), accept_ids[n % len(accept_ids)]),
+        "training_results": lambda n: main.training_results.callback(interaction(member(config.staff_role_id)), f"trainee{n}", "9/10", "Passed", "DST"),
+        "training_stats": lambda n: main.training_stats.callback(interaction(member(config.staff_role_id)), f"trainee{n % 100}"),
+        "leaderboard": lambda n: main.training_leaderboard.callback(interaction(member(config.staff_role_id)), "trainee", "pass_rate", 3),
+        "training_schedule": lambda n: main.training_schedule.callback(interaction(member(config.staff_role_id)), "", 10),
+        "error_info": lambda n: main.error_info.callback(interaction(member()), "LASD-E-2581"),
+        "on_message": lambda n: main.on_message(FakeMessage(channel, author=member())),
+        "on_message_staff": lambda n: main.on_message(FakeMessage(training_channel, author=member(config.staff_role_id))),
+    }
+
+    results = []
+    for name, make_call in cases.items():
+        samples, ops = await time_calls(make_call, iterations)
+        results.append((name, percentile(samples, 0.5), percentile(samples, 0.99), ops))
+    return results
+
+
+async def run(sizes, iterations):
+    import main
+
+    # Per-call INFO logging would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    # Measure handler cost, not Discord's rate limits, which the fakes don't enforce
+    main.outbox.channel_rate = main.outbox.dm_rate = (10**9, 1.0)
+
+    for size in sizes:
+        print(f"\n== {size:,} trainings ({main.TRAINING_STORE_BACKEND}) ==")
+        print(f"{'command':<18}{'p50 ms':>10}{'p99 ms':>10}{'ops/sec':>12}")
+        for name, p50, p99, ops in await bench_size(main, size, iterations):
+            print(f"{name:<18}{p50 * 1000:>10.3f}{p99 * 1000:>10.3f}{ops:>12.1f}")
+
+    for state in main.guild_states:
+        await state.flush()
+        state.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LASD command handlers offline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args(argv)
+
+    # main.py resolves its data files against the working directory, so keep them out of the repo
+    root = os.getcwd()
+    os.environ["LASD_TRAINING_BACKEND"] = args.backend
+    with tempfile.TemporaryDirectory(prefix="lasd-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            asyncio.run(run(args.sizes, args.iterations))
+        finally:
+            import persistence
+            persistence.shutdown()
+            os.chdir(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import logging
+
+import persistence
+
+
+def tree_hash(tree, guild=None):
+    # Hash the payload Discord would receive, so any change to names, options or descriptions triggers a sync
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: command["name"]
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+async def sync_if_changed(tree, state_path, guild=None, force=False):
+    """Upload the command tree only when it differs from the last successful sync.
+
+    With ``guild`` set, global commands are copied to that guild and synced
+    there, which Discord applies instantly; the global scope is emptied once
+    so earlier global deploys don't show every command twice in that guild.
+    Returns the synced commands, or ``None`` when nothing changed.
+    """
+    scope = str(guild.id) if guild is not None else "global"
+    state = await persistence.read_json(state_path, {})
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+        tree.clear_commands(guild=None)
+        cleared = tree_hash(tree)
+        if force or state.get("global") != cleared:
+            await tree.sync()
+            state["global"] = cleared
+            await persistence.write_json(state_path, state)
+            logging.info("Cleared global commands in favour of guild commands")
+
+    current = tree_hash(tree, guild)
+    if not force and state.get(scope) == current:
+        logging.info(f"Command tree unchanged ({scope}), skipping sync")
+        return None
+
+    synced = await tree.sync(guild=guild)
+    state[scope] = current
+    await persistence.write_json(state_path, state)
+    logging.info(f"Synced {len(synced)} command(s) ({scope})")
+    return synced
@@ -0,0 +1,87 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+
+from persistence import write_json
+
+
+class CooldownManager:
+    """Per-user submission cooldowns held in memory with heap-based expiry.
+
+    Checks never touch disk. Changes are written back in one batch after
+    ``flush_delay`` seconds on the I/O thread, and only unexpired entries
+    are persisted.
+    """
+
+    def __init__(self, path, window=3600, flush_delay=5.0, executor=None):
+        self.path = path
+        self._executor = executor
+        self.window = window
+        self.flush_delay = flush_delay
+        self._started = {}
+        self._heap = []
+        self._dirty = False
+        self._flush_handle = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logging.error(f"Error reading cooldown file: {e}")
+            return
+
+        for user_id, started in data.items():
+            self._started[user_id] = started
+            heapq.heappush(self._heap, (started + self.window, user_id))
+        self._evict(time.time())
+
+    def _evict(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self._heap)
+            # Skip stale heap entries left behind by a newer cooldown
+            if self._started.get(user_id) == expires_at - self.window:
+                del self._started[user_id]
+                self._dirty = True
+
+    def __len__(self):
+        return len(self._started)
+
+    def remaining(self, user_id, now=None):
+        now = time.time() if now is None else now
+        self._evict(now)
+        started = self._started.get(user_id)
+        if started is None:
+            return 0
+        return max(0, int(self.window - (now - started)))
+
+    def start(self, user_id, now=None):
+        now = time.time() if now is None else now
+        self._evict(now)
+        self._started[user_id] = now
+        heapq.heappush(self._heap, (now + self.window, user_id))
+        self._dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(
+            self.flush_delay, lambda: asyncio.ensure_future(self.flush())
+        )
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._evict(time.time())
+        if not self._dirty:
+            return
+        self._dirty = False
+        await write_json(self.path, dict(self._started), executor=self._executor)
@@ -0,0 +1,173 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+
+ITEMS_PER_PAGE = 10  # Customize based on how many fit nicely in one embed
+_PAGE_PATTERN = re.compile(r"Showing page (\d+) of")
+MAX_SUGGESTIONS = 25  # Discord's autocomplete limit
+
+
+def _trigrams(text):
+    text = f"  {text.lower()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ErrorCatalog:
+    """Page and per-code embeds for an error dict, built once and rebuilt if the dict changes.
+
+    discord is only imported when an embed is built, so tools can search the
+    catalog without loading it.
+    """
+
+    def __init__(self, errors, items_per_page=ITEMS_PER_PAGE):
+        self.errors = errors
+        self.items_per_page = items_per_page
+        self._snapshot = None
+        self._pages = None
+        self._codes = None
+        self._sorted_codes = []
+        self._trigram_index = {}
+
+    def _refresh(self):
+        # The catalog is tiny, so comparing a snapshot is cheaper than any invalidation hook
+        snapshot = tuple(self.errors.items())
+        if snapshot == self._snapshot:
+            return
+        self._snapshot = snapshot
+        # Embeds are rebuilt on next use; search only needs the index below
+        self._pages = None
+        self._codes = None
+
+        # Sorted codes give prefix lookups by bisection; trigrams catch near misses and description words
+        self._sorted_codes = sorted(code for code, _ in snapshot)
+        self._trigram_index = {}
+        for code, desc in snapshot:
+            for gram in _trigrams(code) | _trigrams(desc):
+                self._trigram_index.setdefault(gram, set()).add(code)
+
+    def _refresh_embeds(self):
+        self._refresh()
+        if self._pages is not None:
+            return
+        snapshot = self._snapshot
+        total_pages = self.total_pages
+        self._pages = [
+            self._build_page(snapshot[page * self.items_per_page:(page + 1) * self.items_per_page], page, total_pages)
+            for page in range(total_pages)
+        ]
+        self._codes = {code: self._build_code(code, desc) for code, desc in snapshot}
+
+    @staticmethod
+    def _build_page(items, page, total_pages):
+        import discord
+
+        embed = discord.Embed(
+            title="📘 LASD Error Code Directory",
+            description=f"Showing page {page + 1} of {total_pages}",
+            color=discord.Color.dark_blue()
+        )
+        for code, desc in items:
+            embed.add_field(name=f"🔹 {code}", value=desc, inline=False)
+        embed.set_footer(text="LASD | Use /error-info <code> for specific details")
+        return embed
+
+    @staticmethod
+    def _build_code(code, desc):
+        import discord
+
+        embed = discord.Embed(
+            title=f"🔎 **Error Code: {code}**",
+            description=f"Here is the detailed information about **{code}**.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="⚠️ Error Description", value=desc, inline=False)
+        embed.add_field(
+            name="📝 Suggested Action",
+            value="Please contact the support team if you need assistance.",
+            inline=False
+        )
+        embed.set_footer(text="LASD | Error Lookup Service")
+        return embed
+
+    @property
+    def total_pages(self):
+        self._refresh()
+        return max(1, math.ceil(len(self._snapshot) / self.items_per_page))
+
+    def page_embed(self, page):
+        self._refresh_embeds()
+        return self._pages[page]
+
+    def code_embed(self, code):
+        """The cached embed for ``code``, or ``None`` if it isn't in the catalog."""
+        self._refresh_embeds()
+        return self._codes.get(code)
+
+    def search(self, query, limit=MAX_SUGGESTIONS):
+        """Rank codes for ``query``: code prefix matches first, then by shared trigrams.
+
+        Returns ``(code, description)`` pairs.
+        """
+        self._refresh()
+        query = query.strip()
+        if not query:
+            return [(code, self.errors[code]) for code in self._sorted_codes[:limit]]
+
+        upper = query.upper()
+        start = bisect.bisect_left(self._sorted_codes, upper)
+        end = bisect.bisect_left(self._sorted_codes, upper + "\uffff")
+        ranked = self._sorted_codes[start:end][:limit]
+
+        if len(ranked) < limit:
+            grams = _trigrams(query)
+            scores = Counter()
+            for gram in grams:
+                scores.update(self._trigram_index.get(gram, ()))
+            for code in ranked:
+                del scores[code]
+            # Need at least a third of the query's trigrams so short noise doesn't match everything
+            threshold = max(1, len(grams) // 3)
+            ranked += [
+                code for code, score in heapq.nsmallest(limit - len(ranked), scores.items(), key=lambda item: (-item[1], item[0]))
+                if score >= threshold
+            ]
+
+        return [(code, self.errors[code]) for code in ranked]
+
+    def unknown_code_embed(self, code):
+        import discord
+
+        embed = discord.Embed(
+            title="❌ **Unknown Error Code**",
+            description=f"The error code **{code}** does not exist or is invalid.",
+            color=discord.Color.red()
+        )
+        embed.add_field(
+            name="⚠️ Error Details",
+            value="Please ensure that the code is correct and try again.",
+            inline=False
+        )
+        suggestions = self.search(code, limit=3)
+        if suggestions:
+            embed.add_field(
+                name="🔍 Did you mean",
+                value="\n".join(f"**{match}** — {desc}" for match, desc in suggestions),
+                inline=False
+            )
+        embed.add_field(
+            name="💬 Need Help?",
+            value="If you're still unsure, please make a ticket and request <@895170771830308865> to be added.",
+            inline=False
+        )
+        embed.set_footer(text="LASD | Error Lookup Service")
+        return embed
+
+    @staticmethod
+    def page_of(message):
+        # Page state lives in the message itself, so one view can serve every user across restarts
+        if message is None or not message.embeds:
+            return 0
+        match = _PAGE_PATTERN.search(message.embeds[0].description or "")
+        return int(match.group(1)) - 1 if match else 0
@@ -0,0 +1,24 @@
+import discord
+
+
+class ErrorPagesView(discord.ui.View):
+    """Single persistent paginator for /list-error-codes, registered once with ``bot.add_view``."""
+
+    def __init__(self, catalog):
+        super().__init__(timeout=None)
+        self.catalog = catalog
+
+    async def _turn(self, interaction, step):
+        page = self.catalog.page_of(interaction.message) + step
+        if 0 <= page < self.catalog.total_pages:
+            await interaction.response.edit_message(embed=self.catalog.page_embed(page), view=self)
+        else:
+            await interaction.response.defer()
+
+    @discord.ui.button(label="⏮️ Prev", style=discord.ButtonStyle.primary, custom_id="lasd:error-codes:prev")
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="⏭️ Next", style=discord.ButtonStyle.primary, custom_id="lasd:error-codes:next")
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._turn(interaction, 1)
@@ -7,4 +7,5 @@ ERRORS = {
     "LASD-E-2712": "Unexpected error. Please contact staff or try again later.",
     "LASD-E-1281": "EVOC Traning does not require Group.",
     "LASD-E-2871": "You do not have permisson to run this command.",
+    "LASD-E-3104": "This server is not set up for trainings.",
 }
@@ -0,0 +1,123 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from persistence import run_io
+from storage import is_accepted, is_expired
+
+DISCORD_EPOCH_MS = 1420070400000
+EXPORT_FORMATS = ("csv", "jsonl")
+TRAINING_STATUSES = ("accepted", "pending", "expired")
+RESULT_STATUSES = ("passed", "failed")
+
+TRAINING_FIELDS = (
+    "training_id", "submitted_at", "username", "user_id", "training_type",
+    "available_time", "group_status", "accepted", "status", "message_id"
+)
+RESULT_FIELDS = ("logged_at", "trainee", "host_id", "training_type", "passed", "score", "notes")
+
+
+def parse_date(text, end=False):
+    """Turn ``YYYY-MM-DD`` into a UTC timestamp; ``end`` gives the start of the next day so ranges include the last day."""
+    day = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return (day + timedelta(days=1) if end else day).timestamp()
+
+
+def snowflake_time(snowflake):
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH_MS) / 1000
+
+
+def training_status(record):
+    if is_accepted(record):
+        return "accepted"
+    return "expired" if is_expired(record) else "pending"
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+async def training_rows(store, since=None, until=None, training_type=None, status=None):
+    # Expired requests are left out of pending scans, so they are picked out of the full history
+    accepted = {"accepted": True, "pending": False}.get(status)
+    async for page in store.scan(training_type=training_type, accepted=accepted):
+        rows = []
+        for training_id, record in page:
+            if status is not None and training_status(record) != status:
+                continue
+            # Records have no timestamp of their own, but the submission message's ID does
+            submitted_at = snowflake_time(record["message_id"]) if record.get("message_id") else None
+            if since is not None and (submitted_at is None or submitted_at < since):
+                continue
+            if until is not None and (submitted_at is None or submitted_at >= until):
+                continue
+            rows.append({
+                **record,
+                "training_id": training_id,
+                "submitted_at": _iso(submitted_at) if submitted_at else "",
+                "accepted": is_accepted(record),
+                "status": training_status(record)
+            })
+        if rows:
+            yield rows
+
+
+async def result_rows(results, since=None, until=None, training_type=None, status=None):
+    passed = None if status is None else status == "passed"
+    async for page in results.scan(since, until, training_type, passed):
+        for row in page:
+            row["logged_at"] = _iso(row["logged_at"])
+        yield page
+
+
+def _write_page(f, page, fmt, fields):
+    buffer = io.StringIO()
+    if fmt == "csv":
+        csv.DictWriter(buffer, fields, extrasaction="ignore").writerows(page)
+    else:
+        for row in page:
+            buffer.write(json.dumps({field: row.get(field) for field in fields}) + "\n")
+    f.write(buffer.getvalue())
+
+
+async def write_export(path, pages, fmt="csv", fields=TRAINING_FIELDS):
+    """Stream pages of rows into a gzipped CSV or JSONL file and return how many rows were written.
+
+    Only one page is held at a time; encoding, compression and writes all
+    happen on the I/O thread.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    f = await run_io(lambda: gzip.open(path, "wt", encoding="utf-8", newline=""))
+    written = 0
+    try:
+        if fmt == "csv":
+            await run_io(_write_page, f, [dict(zip(fields, fields))], fmt, fields)
+        async for page in pages:
+            await run_io(_write_page, f, page, fmt, fields)
+            written += len(page)
+    finally:
+        await run_io(f.close)
+    return written
+
+
+async def export_history(path, source, dataset="trainings", fmt="csv", since=None, until=None, training_type=None, status=None):
+    """Export a training store (``dataset="trainings"``) or a ``ResultsLog`` (``"results"``) to ``path``."""
+    if dataset == "trainings":
+        if status not in (None, *TRAINING_STATUSES):
+            raise ValueError(f"Trainings can be filtered by {' or '.join(TRAINING_STATUSES)}, not {status}")
+        pages, fields = training_rows(source, since, until, training_type, status), TRAINING_FIELDS
+    elif dataset == "results":
+        if status not in (None, *RESULT_STATUSES):
+            raise ValueError(f"Results can be filtered by {' or '.join(RESULT_STATUSES)}, not {status}")
+        pages, fields = result_rows(source, since, until, training_type, status), RESULT_FIELDS
+    else:
+        raise ValueError(f"Unknown export dataset: {dataset}")
+    return await write_export(path, pages, fmt, fields)
+
+
+def export_filename(dataset, fmt):
+    return f"lasd-{dataset}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}.gz"
@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import logging
+import os
+
+import persistence
+from export import EXPORT_FORMATS, RESULT_STATUSES, TRAINING_STATUSES, export_filename, export_history, parse_date
+from results import ResultsLog
+from storage import open_training_store
+
+
+async def run(args):
+    if args.dataset == "results":
+        source = ResultsLog(os.path.join(args.data_dir, "training_results.jsonl"))
+    else:
+        filename = "training_logs.db" if args.backend == "sqlite" else "training_logs.json"
+        source = open_training_store(args.backend, os.path.join(args.data_dir, filename))
+
+    output = args.output or export_filename(args.dataset, args.format)
+    try:
+        written = await export_history(
+            output,
+            source,
+            dataset=args.dataset,
+            fmt=args.format,
+            since=parse_date(args.since) if args.since else None,
+            until=parse_date(args.until, end=True) if args.until else None,
+            training_type=args.type,
+            status=args.status
+        )
+    finally:
+        source.close()
+    logging.info(f"Exported {written} {args.dataset} row(s) to {output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export training logs or results to a gzipped CSV/JSONL file")
+    parser.add_argument("--data-dir", default=".", help="Directory holding the guild's training files")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default=os.getenv("LASD_TRAINING_BACKEND", "json"))
+    parser.add_argument("--dataset", choices=("trainings", "results"), default="trainings")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--since", help="First day to include, YYYY-MM-DD (UTC)")
+    parser.add_argument("--until", help="Last day to include, YYYY-MM-DD (UTC)")
+    parser.add_argument("--type", choices=("DST", "EVOC"), help="Only this training type")
+    parser.add_argument("--status", choices=TRAINING_STATUSES + RESULT_STATUSES, help="accepted/pending/expired for trainings, passed/failed for results")
+    parser.add_argument("--output", help="File to write (default lasd-<dataset>-<timestamp>.<format>.gz)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        asyncio.run(run(args))
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        persistence.shutdown()
+
+
+if __name__ == "__main__":
+    main()
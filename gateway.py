@@ -0,0 +1,48 @@
+import discord
+
+# Discord's sharding formula: a guild's events arrive on shard (guild_id >> 22) % shard_count
+def shard_for(guild_id, shard_count):
+    return (guild_id >> 22) % shard_count
+
+
+# "slim" subscribes only to what the commands use; "full" is the old Intents.all() behaviour
+PROFILES = ("slim", "full")
+
+
+def client_options(profile="slim"):
+    """Keyword arguments for ``discord.Client`` for the given intent and cache profile."""
+    if profile == "full":
+        return {"intents": discord.Intents.all()}
+    if profile != "slim":
+        raise ValueError(f"Unknown intent profile: {profile} (expected one of {', '.join(PROFILES)})")
+
+    intents = discord.Intents.none()
+    intents.guilds = True
+    # Role checks and the member cache used by MemberResolver
+    intents.members = True
+    # on_message only looks at the channel and author, never the content
+    intents.guild_messages = True
+
+    return {
+        "intents": intents,
+        # Only keep members seen since connecting; misses fall back to MemberResolver's REST lookup
+        "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+        "chunk_guilds_at_startup": False,
+        # Nothing reads cached messages, so don't keep the default 1000
+        "max_messages": None,
+    }
+
+
+def create_client(profile="slim", shard_count=None, shard_ids=None):
+    """A plain ``Client`` when ``shard_count`` is None, otherwise an ``AutoShardedClient``.
+
+    ``shard_count="auto"`` lets Discord pick the count. Passing ``shard_ids``
+    runs only those shards, so several processes can split one shard count.
+    """
+    options = client_options(profile)
+    if shard_count is None:
+        return discord.Client(**options)
+    if shard_count != "auto":
+        options["shard_count"] = shard_count
+        options["shard_ids"] = shard_ids
+    return discord.AutoShardedClient(**options)
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, fields, replace
+
+import persistence
+from availability import WindowIndex
+from cooldowns import CooldownManager
+from ids import TrainingIdAllocator
+from results import ResultsLog
+from storage import open_training_store
+
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """Role and channel IDs for one division's server, plus where its data lives."""
+
+    dst_role_id: int
+    staff_role_id: int
+    master_deputy_role_ids: tuple
+    training_channel_id: int
+    results_channel_id: int
+    instructions_channel_id: int
+    data_dir: str = "."
+
+    @classmethod
+    def from_dict(cls, data, **defaults):
+        known = {field.name for field in fields(cls)}
+        values = {**defaults, **{key: value for key, value in data.items() if key in known}}
+        values["master_deputy_role_ids"] = tuple(values.get("master_deputy_role_ids", ()))
+        return cls(**values)
+
+
+@dataclass(frozen=True)
+class ResolvedGuild:
+    """A guild's config with its channels already looked up."""
+
+    config: GuildConfig
+    training_channel: object
+    results_channel: object
+
+
+class GuildRegistry:
+    """Per-guild configs loaded from ``guilds.json``, with a default for unlisted guilds.
+
+    The file looks like ``{"default": {...}, "guilds": {"<guild id>": {...}}}``;
+    guild entries only need the fields that differ from the default.
+
+    With ``partition_default`` an unlisted guild gets the default config with
+    its own ``guilds/<id>`` data directory, so shard processes never share one.
+    """
+
+    def __init__(self, default, guilds, mtime=None, partition_default=False):
+        self.default = default
+        self.guilds = guilds
+        self.partition_default = partition_default
+        self._partitioned = {}
+        # File modification time at load, so a watcher can tell when to reload
+        self.mtime = mtime
+        self._resolved = {}
+        configs = [default, *guilds.values()] if default else list(guilds.values())
+        # Every channel any guild restricts, so on_message can drop everything else with one lookup
+        self.restricted_channel_ids = frozenset(config.training_channel_id for config in configs)
+
+    @classmethod
+    def load(cls, path, fallback, partition_default=False):
+        try:
+            with open(path, "r") as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(fallback, {}, partition_default=partition_default)
+
+        default_data = data.get("default")
+        default = GuildConfig.from_dict(default_data, **vars(fallback)) if default_data is not None else None
+        base = vars(default or fallback)
+        guilds = {
+            int(guild_id): GuildConfig.from_dict(entry, **{**base, "data_dir": os.path.join("guilds", str(guild_id))})
+            for guild_id, entry in data.get("guilds", {}).items()
+        }
+        logging.info(f"Loaded config for {len(guilds)} guild(s) from {path}")
+        return cls(default, guilds, mtime, partition_default)
+
+    def get(self, guild_id):
+        config = self.guilds.get(guild_id)
+        if config is not None or self.default is None or not self.partition_default:
+            return config or self.default
+        config = self._partitioned.get(guild_id)
+        if config is None:
+            config = self._partitioned[guild_id] = replace(
+                self.default, data_dir=os.path.join("guilds", str(guild_id))
+            )
+        return config
+
+    def resolve(self, guild):
+        """Return the guild's ``ResolvedGuild``, or None if it has no config.
+
+        Channel objects are looked up once per registry; a reload builds a new
+        registry and so starts with an empty cache.
+        """
+        resolved = self._resolved.get(guild.id)
+        if resolved is not None:
+            return resolved
+        config = self.get(guild.id)
+        if config is None:
+            return None
+        resolved = ResolvedGuild(
+            config,
+            guild.get_channel(config.training_channel_id),
+            guild.get_channel(config.results_channel_id)
+        )
+        # Don't pin a miss; the channel may just not be cached yet
+        if None not in (resolved.training_channel, resolved.results_channel):
+            self._resolved[guild.id] = resolved
+        return resolved
+
+
+class GuildState:
+    """The training store, results, ID allocator and cooldowns for one guild's data directory.
+
+    All of them share one I/O thread of their own, so a slow write or
+    compaction here never holds up another guild.
+    """
+
+    def __init__(self, config, backend, cooldown_seconds=3600):
+        self.config = config
+        os.makedirs(config.data_dir, exist_ok=True)
+        self.executor = persistence.io_executor(f"lasd-io-{os.path.basename(os.path.abspath(config.data_dir))}")
+        path = os.path.join(config.data_dir, "training_logs.db" if backend == "sqlite" else "training_logs.json")
+        self.store = open_training_store(backend, path, executor=self.executor)
+        self.cooldowns = CooldownManager(
+            os.path.join(config.data_dir, "training_cooldowns.json"),
+            window=cooldown_seconds,
+            executor=self.executor
+        )
+        self.ids = TrainingIdAllocator(
+            os.path.join(config.data_dir, "training_counters.json"),
+            legacy_path=os.path.join(config.data_dir, "training_ids.json"),
+            executor=self.executor
+        )
+        self.results = ResultsLog(os.path.join(config.data_dir, "training_results.jsonl"), executor=self.executor)
+        # Pending requests by window end, so /training-schedule never rescans the store
+        self.pending = WindowIndex.build(
+            lambda window: (window[1], window[0]),
+            self.store.load_records(accepted=False).items()
+        )
+        # Accepted requests still owed a reminder, by window start
+        self.upcoming = WindowIndex.build(
+            lambda window: (window[0],),
+            self.store.load_reminders(time.time()).items(),
+            keep_unparsed=False
+        )
+
+    async def flush(self):
+        await self.cooldowns.flush()
+
+    def close(self):
+        # Let queued writes land before their files and connections go away
+        self.executor.shutdown(wait=True)
+        self.store.close()
+        self.results.close()
+
+
+class GuildStates:
+    """Opens one ``GuildState`` per data directory, only for guilds this process owns."""
+
+    def __init__(self, registry, backend, cooldown_seconds=3600, owns=lambda guild_id: True):
+        self.registry = registry
+        self.backend = backend
+        self.cooldown_seconds = cooldown_seconds
+        self.owns = owns
+        self._states = {}
+
+    def _open(self, config):
+        state = self._states.get(config.data_dir)
+        if state is None:
+            state = self._states[config.data_dir] = GuildState(config, self.backend, self.cooldown_seconds)
+        return state
+
+    def get(self, guild_id):
+        """The guild's state if it's open; opening reads from disk, so that is left to ``open_all``."""
+        # Commands used in DMs have no guild and therefore no training data
+        config = self.registry.get(guild_id) if guild_id is not None else None
+        if config is None or not self.owns(guild_id):
+            return None
+        return self._states.get(config.data_dir)
+
+    def open_all(self, registry=None, guild_ids=()):
+        """Open every guild's state, for ``registry`` if given so it can be swapped in afterwards.
+
+        Blocking, so run it through ``persistence.run_io``. ``guild_ids`` are
+        the guilds the bot is in, which a partitioned default needs to know
+        which ``guilds/<id>`` directories to open.
+        """
+        # Load everything up front so no handler pays for the first disk read
+        registry = registry or self.registry
+        if registry.default is not None and not registry.partition_default:
+            self._open(registry.default)
+        for guild_id, config in registry.guilds.items():
+            if self.owns(guild_id):
+                self._open(config)
+        for guild_id in guild_ids:
+            config = registry.get(guild_id)
+            if config is not None and self.owns(guild_id):
+                self._open(config)
+
+    def __iter__(self):
+        # A copy, since jobs await between states while handlers and reloads open new ones
+        return iter(list(self._states.values()))
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+import os
+import re
+
+from persistence import atomic_write_json, write_json
+
+DST_PREFIX = "LASD-DST"
+EVOC_PREFIX = "LASD-EVOC"
+MAX_RANGE_SIZE = 500
+
+
+def split_training_id(training_id, prefixes=(DST_PREFIX, EVOC_PREFIX)):
+    # Longest prefix first in case one prefix extends another
+    for prefix in sorted(prefixes, key=len, reverse=True):
+        suffix = training_id[len(prefix):]
+        if training_id.startswith(prefix) and suffix.isdigit():
+            return prefix, int(suffix)
+    return None, None
+
+
+def parse_training_ids(text):
+    """Expand ``"LASD-DST001, LASD-DST005..LASD-DST009"`` into a de-duplicated list of IDs.
+
+    The end of a range may be a bare number (``LASD-DST005..9``).
+    Raises ``ValueError`` for malformed or oversized ranges.
+    """
+    training_ids = []
+    for token in re.split(r"[\s,]+", text.strip().upper()):
+        if not token:
+            continue
+        if ".." not in token:
+            training_ids.append(token)
+            continue
+
+        start, end = token.split("..", 1)
+        prefix, first = split_training_id(start)
+        end_prefix, last = (prefix, int(end)) if end.isdigit() else split_training_id(end)
+        if prefix is None or end_prefix != prefix or last < first:
+            raise ValueError(f"Invalid training ID range: {token}")
+        if last - first >= MAX_RANGE_SIZE:
+            raise ValueError(f"Ranges are limited to {MAX_RANGE_SIZE} IDs: {token}")
+        training_ids.extend(f"{prefix}{n:03d}" for n in range(first, last + 1))
+    return list(dict.fromkeys(training_ids))
+
+
+class TrainingIdAllocator:
+    """Hands out sequential training IDs from a per-prefix counter.
+
+    Only the counters are persisted. The first run migrates the old
+    ``training_ids.json`` list by taking the highest number per prefix.
+    """
+
+    def __init__(self, path, legacy_path=None, prefixes=(DST_PREFIX, EVOC_PREFIX), executor=None):
+        self.path = path
+        self._executor = executor
+        self.legacy_path = legacy_path
+        self.prefixes = prefixes
+        self._lock = asyncio.Lock()
+        self.counters = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        counters = self._migrate()
+        atomic_write_json(self.path, counters)
+        return counters
+
+    def _migrate(self):
+        counters = {prefix: 0 for prefix in self.prefixes}
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return counters
+
+        with open(self.legacy_path, "r") as f:
+            existing_ids = json.load(f).get("ids", [])
+
+        for training_id in existing_ids:
+            prefix, number = split_training_id(training_id, self.prefixes)
+            if prefix is not None:
+                counters[prefix] = max(counters[prefix], number)
+
+        logging.info(f"Migrated {len(existing_ids)} training ID(s) from {self.legacy_path}: {counters}")
+        return counters
+
+    async def allocate(self, prefix):
+        async with self._lock:
+            next_id_num = self.counters.get(prefix, 0) + 1
+            self.counters[prefix] = next_id_num
+            await write_json(self.path, dict(self.counters), executor=self._executor)
+        return f"{prefix}{next_id_num:03d}"
@@ -0,0 +1,72 @@
+"""Offline maintenance jobs, without importing discord or starting the bot.
+
+    python -m lasdctl migrate --source training_logs.json --target training_logs.db
+    python -m lasdctl compact --data-dir . --data-dir guilds/123
+    python -m lasdctl export --dataset results --format jsonl --since 2025-01-01
+    python -m lasdctl bench --sizes 10000 --iterations 200
+
+Each job's module is only imported once it is picked, so ``--help`` and
+the cheap jobs start in milliseconds.
+"""
+import argparse
+import importlib
+import sys
+
+# name -> ("module:function" taking argv, summary)
+JOBS = {
+    "migrate": ("migrate_storage:main", "Import training_logs.json into the SQLite training store"),
+    "compact": (f"{__name__}:compact", "Fold training store WALs back into their snapshots"),
+    "export": ("export_history:main", "Export training logs or results to a gzipped CSV/JSONL file"),
+    "bench": ("benchmarks.run:main", "Benchmark the command handlers against fake Discord objects")
+}
+
+
+def compact(argv=None):
+    parser = argparse.ArgumentParser(prog="lasdctl compact", description=JOBS["compact"][1])
+    parser.add_argument("--data-dir", action="append", help="Directory holding a guild's training files (repeatable, default .)")
+    parser.add_argument("--backend", choices=("json", "sqlite"))
+    args = parser.parse_args(argv)
+
+    import asyncio
+    import logging
+    import os
+
+    import persistence
+    from storage import open_training_store
+
+    backend = args.backend or os.getenv("LASD_TRAINING_BACKEND", "json")
+    filename = "training_logs.db" if backend == "sqlite" else "training_logs.json"
+
+    async def run():
+        for data_dir in args.data_dir or ["."]:
+            store = open_training_store(backend, os.path.join(data_dir, filename))
+            try:
+                await store.compact()
+            finally:
+                store.close()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        asyncio.run(run())
+    finally:
+        persistence.shutdown()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="lasdctl",
+        description="LASD bot maintenance jobs",
+        epilog="\n".join(f"  {name:<9}{summary}" for name, (_, summary) in JOBS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("job", choices=JOBS, metavar="job", help="one of: " + ", ".join(JOBS))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="options for the job, see `lasdctl <job> --help`")
+    args = parser.parse_args(argv[:1])
+
+    module_name, function = JOBS[args.job][0].split(":")
+    return getattr(importlib.import_module(module_name), function)(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
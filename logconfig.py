@@ -0,0 +1,102 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+
+# Extra fields copied into JSON records when a log call passes them via ``extra=``
+STRUCTURED_FIELDS = ("command", "training_id", "user_id", "latency_ms")
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at midnight and also whenever the file grows past ``max_bytes``."""
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=30):
+        super().__init__(filename, when="midnight", backupCount=backup_count, encoding="utf-8")
+        self.max_bytes = max_bytes
+        # Size rollovers within a day get a zero-padded counter after the date so names sort in rotation order
+        self.extMatch = re.compile(r"^\d{4}-\d{2}-\d{2}(\.\d+)?$", re.ASCII)
+
+    def _backups(self):
+        dir_name, base_name = os.path.split(self.baseFilename)
+        prefix = base_name + "."
+        return [
+            os.path.join(dir_name, name)
+            for name in os.listdir(dir_name)
+            if name.startswith(prefix) and self.extMatch.match(name[len(prefix):])
+        ]
+
+    def rotation_filename(self, default_name):
+        # Always one past the highest counter for the day, never the first free slot, so a newer
+        # file can't take a name that sorts before older ones
+        prefix = os.path.basename(default_name) + "."
+        counters = [
+            int(os.path.basename(path)[len(prefix):])
+            for path in self._backups()
+            if os.path.basename(path).startswith(prefix)
+        ]
+        if counters or os.path.exists(default_name):
+            default_name = f"{default_name}.{max(counters, default=0) + 1:04d}"
+        return super().rotation_filename(default_name)
+
+    def getFilesToDelete(self):
+        backups = self._backups()
+        if len(backups) <= self.backupCount:
+            return []
+        # Oldest first by modification time, with the name breaking ties within one clock tick
+        backups.sort(key=lambda path: (os.path.getmtime(path), path))
+        return backups[:len(backups) - self.backupCount]
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(log_dir="logs", level=logging.INFO, json_format=False,
+                      max_bytes=10 * 1024 * 1024, backup_count=30, stream=None):
+    """Send every record through a queue to a background listener that does the writing.
+
+    Returns the started ``QueueListener``; call ``stop()`` on it before exiting
+    so queued records are flushed.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = JsonFormatter() if json_format else logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+
+    file_handler = SizedTimedRotatingFileHandler(
+        os.path.join(log_dir, "lasd.log"), max_bytes=max_bytes, backup_count=backup_count
+    )
+    console_handler = logging.StreamHandler(stream)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    return listener
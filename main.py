@@ -1,131 +1,337 @@
 import asyncio
 import time
+STARTUP_BEGAN = time.perf_counter()  # Taken before importing discord so the readout covers the whole boot
 import discord
 from discord import User, app_commands
-import json
 import uuid
 import logging
 import os
 import sys
-from datetime import datetime
-import subprocess
 from errors import ERRORS
-import math
-
-# Setup logging
-if not os.path.exists("logs"):
-    os.makedirs("logs")
-
-today = datetime.now().strftime("%Y-%m-%d")
-log_file = os.path.join("logs", f"{today}.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from error_catalog import ErrorCatalog
+from error_views import ErrorPagesView
+from storage import is_accepted
+from ids import DST_PREFIX, EVOC_PREFIX, parse_training_ids
+from upgrade import upgrade_packages
+from metrics import metrics
+from members import MemberResolver
+from outbox import Outbox
+from gateway import create_client, shard_for
+from guilds import GuildConfig, GuildRegistry, GuildStates
+from command_sync import sync_if_changed
+from export import export_filename, export_history, parse_date, snowflake_time
+from availability import parse_availability, plan_sessions
+from scheduler import Scheduler
+import persistence
+from logconfig import configure_logging
+
+# Set when the bot is started; importing main for tooling leaves logging alone
+log_listener = None
 
 # Constants
-DST_ROLE_ID = 1330291577607684107
-EVOC_ROLE_ID = 1330291574814539786
-PING_ROLE_ID = 1330291576202727567
-INSTRUCTIONS_CHANNEL_ID = 1202417039893995651
-TRAINING_LOG_FILE = "training_logs.json"
+# The original division's IDs, used for any guild not listed in guilds.json
+LEGACY_GUILD_CONFIG = GuildConfig(
+    dst_role_id=1330291577607684107,
+    staff_role_id=1330291576202727567,
+    master_deputy_role_ids=(1330289052125102201,),
+    training_channel_id=1330460907729322014,
+    results_channel_id=1330460924993077278,
+    instructions_channel_id=1202417039893995651
+)
+GUILD_CONFIG_FILE = "guilds.json"
+CONFIG_POLL_SECONDS = float(os.getenv("LASD_CONFIG_POLL_SECONDS", "30"))  # 0 disables watching guilds.json
+RESTRICTED_WARNING_SECONDS = 5
+TRAINING_STORE_BACKEND = os.getenv("LASD_TRAINING_BACKEND", "json")  # "json" or "sqlite"
 RESTART_INFO_FILE = "restart_info.json"
 MAINTENANCE_FILE = "maintenance.json"
-COOLDOWN_FILE = "training_cooldowns.json"
-TRAINING_ID_FILE = "training_ids.json"
+TRAINING_COOLDOWN_SECONDS = 3600
 YOUR_DISCORD_USER_ID = 895170771830308865
+RESTART_PROGRESS_INTERVAL = 2.0
+BULK_DM_CONCURRENCY = 5
+BULK_MENTION_LIMIT = 50
+METRICS_FILE = "metrics.prom"
+EXPORT_DIR = "exports"
+STALE_TRAINING_SECONDS = 14 * 24 * 3600  # Pending requests older than this are marked expired
+REMINDER_LEAD_SECONDS = 30 * 60  # DM accepted trainees this long before their window opens
+REMINDER_CONCURRENCY = 5
+TRAINING_SESSION_SECONDS = 3600  # /training-schedule only puts trainees in a session their whole window covers
+METRICS_PORT = int(os.getenv("LASD_METRICS_PORT", "0"))  # 0 disables the local endpoint
+INTENT_PROFILE = os.getenv("LASD_INTENT_PROFILE", "slim")  # "slim" or "full"
+COMMAND_SYNC_FILE = "command_sync.json"
+SYNC_GUILD_ID = int(os.getenv("LASD_SYNC_GUILD_ID", "0"))  # 0 syncs globally
+# Unset runs one unsharded client; a number or "auto" uses AutoShardedClient
+SHARD_COUNT = os.getenv("LASD_SHARD_COUNT")
+SHARD_COUNT = int(SHARD_COUNT) if SHARD_COUNT and SHARD_COUNT != "auto" else SHARD_COUNT
+# e.g. "0,1" to run only those shards in this process
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("LASD_SHARD_IDS", "").split(",") if shard_id] or None
+
+
+def owns_guild(guild_id):
+    # With split shard processes, each process only opens the stores for its own guilds
+    if SHARD_IDS is None or not isinstance(SHARD_COUNT, int):
+        return True
+    return shard_for(guild_id, SHARD_COUNT) in SHARD_IDS
+
+
+# Shard processes can't share the default data directory, so unlisted guilds each get guilds/<id>
+PARTITION_DEFAULT = SHARD_IDS is not None
+guild_registry = GuildRegistry.load(GUILD_CONFIG_FILE, LEGACY_GUILD_CONFIG, PARTITION_DEFAULT)
+guild_states = GuildStates(guild_registry, TRAINING_STORE_BACKEND, TRAINING_COOLDOWN_SECONDS, owns=owns_guild)
+member_resolver = MemberResolver()
+outbox = Outbox()
+error_catalog = ErrorCatalog(ERRORS)
+error_pages_view = None
+restart_lock = asyncio.Lock()
+scheduler = Scheduler()
+metrics_server = None
+startup_seconds = None
+maintenance_active = False
+config_watcher = None
+
+bot = create_client(INTENT_PROFILE, SHARD_COUNT, SHARD_IDS)
+tree = app_commands.CommandTree(bot)
 
-def load_training_logs():
+
+@bot.event
+async def setup_hook():
+    # Views need a running loop; registering it here keeps old /list-error-codes buttons working after a restart
+    global error_pages_view, maintenance_active, config_watcher
+    # Load every guild's stores before the gateway connects, so no handler pays for the first disk read
+    await persistence.run_io(guild_states.open_all)
+
+    error_pages_view = ErrorPagesView(error_catalog)
+    bot.add_view(error_pages_view)
+
+    # Read once; /devmode keeps the flag in memory and writes it back
     try:
-        with open(TRAINING_LOG_FILE, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logging.warning("Training log file not found, creating new log.")
-        return {}
-
-def save_training_logs(logs):
-    with open(TRAINING_LOG_FILE, "w") as f:
-        json.dump(logs, f, indent=4)
-    logging.info("Training logs saved successfully.")
-
-
-def load_training_cooldowns():
-    if os.path.exists(COOLDOWN_FILE):
-        with open(COOLDOWN_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_training_cooldowns(cooldowns):
-    with open(COOLDOWN_FILE, "w") as f:
-        json.dump(cooldowns, f, indent=4)
-
-# Load existing IDs from the JSON file
-def load_existing_ids():
+        data = await persistence.read_json(MAINTENANCE_FILE, {})
+        maintenance_active = data.get("maintenance", False)
+    except Exception as e:
+        logging.error(f"Error reading maintenance file: {e}")
+
+    if CONFIG_POLL_SECONDS:
+        config_watcher = asyncio.create_task(watch_guild_config())
+
+
+def presence_options():
+    if maintenance_active:
+        return {"status": discord.Status.dnd, "activity": discord.Game(name="Down for maintenance")}
+    return {
+        "status": discord.Status.online,
+        "activity": discord.Activity(type=discord.ActivityType.watching, name="Trainings")
+    }
+
+
+async def reload_guild_config():
+    """Load guilds.json again and swap it in; an invalid file leaves the current config in place."""
+    global guild_registry
     try:
-        with open("training_ids.json", "r") as f:
-            data = json.load(f)
-            return data.get("ids", [])
-    except FileNotFoundError:
-        # If the file doesn't exist, return an empty list
-        return []
-
-# Save updated list of IDs to the JSON file
-def save_existing_ids(ids):
-    with open("training_ids.json", "w") as f:
-        json.dump({"ids": ids}, f, indent=4)
-
-intents = discord.Intents.all()
-intents.members = True
-intents.guilds = True
-intents.message_content = True
-
-bot = discord.Client(intents=intents)
-tree = app_commands.CommandTree(bot)
+        registry = await persistence.run_io(GuildRegistry.load, GUILD_CONFIG_FILE, LEGACY_GUILD_CONFIG, PARTITION_DEFAULT)
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logging.error(f"Keeping current guild config, {GUILD_CONFIG_FILE} is invalid: {e}")
+        return None
+
+    # Open stores for new guilds before any handler can see them
+    await persistence.run_io(guild_states.open_all, registry, [guild.id for guild in bot.guilds])
+    guild_registry = guild_states.registry = registry
+    for guild in bot.guilds:
+        registry.resolve(guild)
+    return registry
+
+
+async def watch_guild_config():
+    # Polling the mtime is cheap and needs no file-watching dependency
+    seen = guild_registry.mtime
+    while True:
+        await asyncio.sleep(CONFIG_POLL_SECONDS)
+        try:
+            mtime = (await persistence.run_io(os.stat, GUILD_CONFIG_FILE)).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != seen:
+            seen = mtime
+            logging.info(f"{GUILD_CONFIG_FILE} changed, reloading")
+            await reload_guild_config()
+
+
+async def reply_not_configured(interaction):
+    await interaction.response.send_message(f"❌ {ERRORS['LASD-E-3104']} ERR CODE: LASD-E-3104", ephemeral=True)
+
+
+async def gather_isolated(**calls):
+    # Run independent REST calls together; one failing is logged and doesn't cancel the others
+    results = dict(zip(calls, await asyncio.gather(*calls.values(), return_exceptions=True)))
+    for label, result in results.items():
+        if isinstance(result, Exception):
+            logging.error(f"{label} failed: {result}")
+    return results
+
 
 @bot.event
+@metrics.instrument
 async def on_ready():
-    logging.info(f"Logged in as {bot.user}")
+    global metrics_server, startup_seconds
+    if startup_seconds is None:
+        startup_seconds = time.perf_counter() - STARTUP_BEGAN
+        logging.info(f"Logged in as {bot.user} in {startup_seconds:.2f}s ({INTENT_PROFILE} intents)")
+    else:
+        logging.info(f"Reconnected as {bot.user}")
 
-    await bot.change_presence(
-        status=discord.Status.online,
-        activity=discord.Activity(type=discord.ActivityType.watching, name="Trainings")
+    if METRICS_PORT and metrics_server is None:
+        try:
+            metrics_server = await metrics.serve(port=METRICS_PORT)
+        except OSError as e:
+            logging.error(f"Failed to start metrics endpoint: {e}")
+
+    # Unlisted guilds only have their own data directory once we know which guilds we're in
+    if guild_registry.partition_default:
+        await persistence.run_io(guild_states.open_all, None, [guild.id for guild in bot.guilds])
+
+    # Look up configured channels now rather than on each command
+    for guild in bot.guilds:
+        guild_registry.resolve(guild)
+
+    # None of these depend on each other, so a slow sync doesn't hold up the rest
+    await gather_isolated(
+        presence=bot.change_presence(**presence_options()),
+        sync=sync_if_changed(
+            tree,
+            COMMAND_SYNC_FILE,
+            guild=discord.Object(id=SYNC_GUILD_ID) if SYNC_GUILD_ID else None
+        ),
+        restart_confirmation=confirm_restart()
     )
+    scheduler.start()
 
-    try:
-        synced = await tree.sync()
-        logging.info(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        logging.error(f"Command sync error: {e}")
 
-    # Restart confirmation logic
-    if os.path.exists(RESTART_INFO_FILE):
-        try:
-            with open(RESTART_INFO_FILE, "r") as f:
-                restart_data = json.load(f)
-            channel = bot.get_channel(restart_data["channel_id"])
-            if channel:
-                await channel.send(f"<@{restart_data['user_id']}>, ✅ Restart complete.")
-                logging.info("Sent restart complete confirmation.")
-            os.remove(RESTART_INFO_FILE)
-        except Exception as e:
-            logging.error(f"Failed to send restart complete message: {e}")
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    # Open a newly joined guild's data off the loop before its first command
+    if guild_registry.partition_default:
+        await persistence.run_io(guild_states.open_all, None, [guild.id])
+    guild_registry.resolve(guild)
+
+
+async def confirm_restart():
+    restart_data = await persistence.read_json(RESTART_INFO_FILE)
+    if restart_data is None:
+        return
+    channel = bot.get_channel(restart_data["channel_id"])
+    if channel:
+        await channel.send(f"<@{restart_data['user_id']}>, ✅ Restart complete.")
+        logging.info("Sent restart complete confirmation.")
+    await persistence.remove_file(RESTART_INFO_FILE)
+
+
+def submitted_at(record):
+    # Records carry no timestamp; the request message's snowflake does
+    return snowflake_time(record["message_id"]) if record.get("message_id") else None
+
+
+@metrics.instrument
+async def expire_stale_trainings():
+    cutoff = time.time() - STALE_TRAINING_SECONDS
+    for state in guild_states:
+        stale = []
+        async for page in state.store.scan(accepted=False):
+            for training_id, record in page:
+                created = submitted_at(record)
+                if created is not None and created < cutoff:
+                    stale.append(training_id)
+        if stale:
+            # Kept for the export history, but no longer pending
+            with metrics.phase("disk"):
+                await state.store.update_many({training_id: {"status": "expired"} for training_id in stale})
+            for training_id in stale:
+                state.pending.discard(training_id)
+            logging.info(f"Expired {len(stale)} pending training(s) older than {STALE_TRAINING_SECONDS // 86400} days")
+
+
+def reminder_dm_embed(record, start) -> discord.Embed:
+    start = int(start)
+    return discord.Embed(
+        title="⏰ Training Reminder",
+        description=(
+            f"Your **{record['training_type']}** training window opens <t:{start}:R> (<t:{start}:t>).\n\n"
+            "Please be in the briefing room on time and ready to participate."
+        ),
+        color=discord.Color.blue()
+    )
+
+
+@metrics.instrument
+async def send_training_reminders():
+    now = time.time()
+    dm_slots = asyncio.Semaphore(REMINDER_CONCURRENCY)
+
+    async def remind(record, window):
+        async with dm_slots:
+            user_id = int(record["user_id"])
+            with metrics.phase("members"):
+                user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+            with metrics.phase("dm"):
+                await outbox.send(user, embed=reminder_dm_embed(record, window[0]))
+
+    for state in guild_states:
+        # Windows that opened before a reminder was due (accepted too late) never will be
+        for training_id, _, _ in list(state.upcoming.items(until=(now,))):
+            state.upcoming.discard(training_id)
+        due = {
+            training_id: (record, window)
+            for training_id, record, window in state.upcoming.items(until=(now + REMINDER_LEAD_SECONDS,))
+        }
+        if not due:
+            continue
+
+        # Mark first so a slow or failed DM is never sent twice
+        with metrics.phase("disk"):
+            await state.store.update_many({training_id: {"reminded": True} for training_id in due})
+        for training_id in due:
+            state.upcoming.discard(training_id)
+        results = await asyncio.gather(*(remind(record, window) for record, window in due.values()), return_exceptions=True)
+        failed = sum(isinstance(result, Exception) for result in results)
+        logging.info(f"Sent {len(due) - failed} training reminder(s), {failed} failed")
+
+
+@metrics.instrument
+async def compact_stores():
+    for state in guild_states:
+        with metrics.phase("disk"):
+            await state.store.compact()
+
+
+@metrics.instrument
+async def flush_buffers():
+    # Also drops expired cooldowns, which are otherwise only evicted when someone submits
+    for state in guild_states:
+        with metrics.phase("disk"):
+            await state.flush()
+
+
+scheduler.every(3600, expire_stale_trainings)
+scheduler.every(60, send_training_reminders, jitter=0.25)
+scheduler.every(6 * 3600, compact_stores)
+scheduler.every(60, flush_buffers)
 
 @tree.command(name="training", description="Log a LASD training session")
 @app_commands.describe(
     available_time="When are you available?",
     group="Were you accepted into the group?"
 )
+@metrics.instrument
 async def training(interaction: discord.Interaction, available_time: str, group: bool):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    resolved = guild_registry.resolve(interaction.guild)
+    config = resolved.config
+
     user = interaction.user
     roles = [role.id for role in user.roles]
     accepted = False
 
-    if DST_ROLE_ID in roles:
+    if config.dst_role_id in roles:
         training_type = "DST"
     else:
         await interaction.response.send_message(
@@ -139,7 +345,7 @@ async def training(interaction: discord.Interaction, available_time: str, group:
         embed = discord.Embed(
             title="🚫 Training Not Submitted",
             description=(f"You must be **accepted into the group** to submit a training log.\n\n"
-                         f"📌 Please review the steps in <#{INSTRUCTIONS_CHANNEL_ID}> before proceeding."),
+                         f"📌 Please review the steps in <#{config.instructions_channel_id}> before proceeding."),
             color=discord.Color.red()
         )
         embed.set_footer(text="Please contact staff for assistance.")
@@ -147,12 +353,11 @@ async def training(interaction: discord.Interaction, available_time: str, group:
         return
 
     # Cooldown logic
-    cooldowns = load_training_cooldowns()
     user_id = str(user.id)
     now = time.time()
 
-    if user_id in cooldowns and now - cooldowns[user_id] < 3600:
-        remaining = int(3600 - (now - cooldowns[user_id]))
+    remaining = state.cooldowns.remaining(user_id, now)
+    if remaining:
         minutes = remaining // 60
         seconds = remaining % 60
         await interaction.response.send_message(
@@ -161,28 +366,23 @@ async def training(interaction: discord.Interaction, available_time: str, group:
         )
         return
 
-    # Generate LASD-Txxx ID
-    logs = load_training_logs()
-    existing_ids = load_existing_ids()
-    next_id_num = 1
-    if existing_ids:
-        # Extract numeric parts and find max
-        id_numbers = [int(k.split("LASD-DST")[-1]) for k in existing_ids]
-        next_id_num = max(id_numbers) + 1
+    # Set cooldown before yielding so a double submit can't slip through
+    state.cooldowns.start(user_id, now)
 
-    training_id = f"LASD-DST{next_id_num:03d}"
-    existing_ids.append(training_id)
-    save_existing_ids(existing_ids)
+    # Acknowledge now so slow REST calls below can't blow the 3-second window
+    await interaction.response.defer(ephemeral=True, thinking=True)
 
-    # Set cooldown
-    cooldowns[user_id] = now
-    save_training_cooldowns(cooldowns)
+    # Generate LASD-DSTxxx ID
+    with metrics.phase("disk"):
+        training_id = await state.ids.allocate(DST_PREFIX)
 
-    logs[training_id] = {
+    record = {
         "username": user.name,
         "user_id": str(user.id),
         "training_type": training_type,
         "available_time": available_time,
+        # Parsed once here so /training-schedule doesn't re-read free text for every pending request
+        "available_window": parse_availability(available_time, now),
         "group_status": group,
         "accepted": accepted,
         "message_id": None  # will update after sending
@@ -200,18 +400,19 @@ async def training(interaction: discord.Interaction, available_time: str, group:
     embed.add_field(name="🆔 Training ID", value=training_id, inline=False)
     embed.set_footer(text="Submitted via /training", icon_url=user.display_avatar.url)
 
-    channel = interaction.guild.get_channel(1330460907729322014)
-    message = await channel.send(
-        content=f"<@&{PING_ROLE_ID}.>, <@{user.id}>",
-        allowed_mentions=discord.AllowedMentions(roles=True, users=True),
-        embed=embed
-    )
+    channel = resolved.training_channel
+    with metrics.phase("rest"):
+        message = await outbox.send(
+            channel,
+            f"<@&{config.staff_role_id}.>, <@{user.id}>",
+            allowed_mentions=discord.AllowedMentions(roles=True, users=True),
+            embed=embed,
+            coalesce=True
+        )
 
-    # Save message ID and update JSON
-    logs[training_id]["message_id"] = message.id
-    save_training_logs(logs)
+    # Save message ID, persist the entry, and only then DM the link
+    record["message_id"] = message.id
 
-    # DM confirmation with link
     training_url = f"https://discord.com/channels/{interaction.guild.id}/{message.channel.id}/{message.id}"
     dm_embed = discord.Embed(
         title="✅ Training Submitted",
@@ -223,133 +424,74 @@ async def training(interaction: discord.Interaction, available_time: str, group:
     )
     dm_embed.set_footer(text="Thank you for your submission!")
 
+    # The confirmation DM must never go out for a request that wasn't saved
     try:
-        await user.send(embed=dm_embed)
-    except discord.Forbidden:
-        await interaction.response.send_message(
+        with metrics.phase("disk"):
+            await state.store.put(training_id, record)
+    except Exception as e:
+        logging.error(f"store failed: {e}")
+        await interaction.followup.send(f"❌ {ERRORS['LASD-E-2712']} ERR CODE: LASD-E-2712", ephemeral=True)
+        return
+    state.pending.add(training_id, record)
+
+    results = await gather_isolated(dm=metrics.timed("dm", outbox.send(user, embed=dm_embed)))
+
+    logging.info(
+        f"Training ID {training_id} submitted by {user}",
+        extra={"command": "training", "training_id": training_id, "user_id": user_id}
+    )
+    if isinstance(results["dm"], discord.Forbidden):
+        await interaction.followup.send(
             "⚠️ Training submitted, but I couldn't DM you. Please enable DMs from server members.",
             ephemeral=True
         )
     else:
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "✅ Your training has been sent! Check your DMs for confirmation.",
             ephemeral=True
         )
 
 @tree.command(name="error-info", description="Look up what an error code means")
 @app_commands.describe(code="The error code to look up, e.g., LASD-E-1012")
+@metrics.instrument
 async def error_info(interaction: discord.Interaction, code: str):
     code = code.upper()
 
-    # Check if the code exists in the ERROR dictionary
-    if code in ERRORS:
-        # Prepare an embed for the error code
-        embed = discord.Embed(
-            title=f"🔎 **Error Code: {code}**",
-            description=f"Here is the detailed information about **{code}**.",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="⚠️ Error Description",
-            value=ERRORS[code],
-            inline=False
-        )
-        embed.add_field(
-            name="📝 Suggested Action",
-            value="Please contact the support team if you need assistance.",
-            inline=False
-        )
-        embed.set_footer(text="LASD | Error Lookup Service")
-
-        # Send the embed as the response
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-    else:
-        # If the code isn't found, show an error message
-        embed = discord.Embed(
-            title="❌ **Unknown Error Code**",
-            description=f"The error code **{code}** does not exist or is invalid.",
-            color=discord.Color.red()
-        )
-        embed.add_field(
-            name="⚠️ Error Details",
-            value="Please ensure that the code is correct and try again.",
-            inline=False
-        )
-        embed.add_field(
-            name="💬 Need Help?",
-            value="If you're still unsure, please make a ticket and request <@895170771830308865> to be added.",
-            inline=False
-        )
-        embed.set_footer(text="LASD | Error Lookup Service")
+    # Embeds for known codes are prebuilt by the catalog
+    embed = error_catalog.code_embed(code) or error_catalog.unknown_code_embed(code)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        # Send the embed with an error message
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+@error_info.autocomplete("code")
+async def error_code_autocomplete(interaction: discord.Interaction, current: str):
+    return [
+        app_commands.Choice(name=f"{code} — {desc}"[:100], value=code)
+        for code, desc in error_catalog.search(current)
+    ]
 
 @tree.command(name="list-error-codes", description="List all available error codes and their meanings")
+@metrics.instrument
 async def list_error_codes(interaction: discord.Interaction):
-    # Constants
-    ITEMS_PER_PAGE = 10  # Customize based on how many fit nicely in one embed
-
-    error_items = list(ERRORS.items())
-    total_pages = math.ceil(len(error_items) / ITEMS_PER_PAGE)
-
-    # Function to generate an embed for a given page
-    def generate_embed(page: int) -> discord.Embed:
-        embed = discord.Embed(
-            title="📘 LASD Error Code Directory",
-            description=f"Showing page {page + 1} of {total_pages}",
-            color=discord.Color.dark_blue()
-        )
-        start_index = page * ITEMS_PER_PAGE
-        end_index = min(start_index + ITEMS_PER_PAGE, len(error_items))
-
-        for code, desc in error_items[start_index:end_index]:
-            embed.add_field(name=f"🔹 {code}", value=desc, inline=False)
-
-        embed.set_footer(text="LASD | Use /error-info <code> for specific details")
-        return embed
-
-    # Start with page 0
-    current_page = 0
-    embed = generate_embed(current_page)
-
-    # Create buttons for pagination
-    class Paginator(discord.ui.View):
-        def __init__(self):
-            super().__init__(timeout=60)  # Adjust timeout as needed
-
-        @discord.ui.button(label="⏮️ Prev", style=discord.ButtonStyle.primary)
-        async def prev_button(self, interaction_button: discord.Interaction, button: discord.ui.Button):
-            nonlocal current_page
-            if current_page > 0:
-                current_page -= 1
-                await interaction_button.response.edit_message(embed=generate_embed(current_page), view=self)
-            else:
-                await interaction_button.response.defer()
-
-        @discord.ui.button(label="⏭️ Next", style=discord.ButtonStyle.primary)
-        async def next_button(self, interaction_button: discord.Interaction, button: discord.ui.Button):
-            nonlocal current_page
-            if current_page < total_pages - 1:
-                current_page += 1
-                await interaction_button.response.edit_message(embed=generate_embed(current_page), view=self)
-            else:
-                await interaction_button.response.defer()
-
-    await interaction.response.send_message(embed=embed, view=Paginator(), ephemeral=True)
+    await interaction.response.send_message(embed=error_catalog.page_embed(0), view=error_pages_view, ephemeral=True)
 
 
 @tree.command(name="training-evoc", description="Request an EVOC training session")
 @app_commands.describe(
     available_time="When are you available?"
 )
+@metrics.instrument
 async def training_evoc(interaction: discord.Interaction, available_time: str):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    resolved = guild_registry.resolve(interaction.guild)
+    config = resolved.config
+
     user = interaction.user
     roles = [role.id for role in user.roles]
     
     # Check if user has the Master Deputy role or higher
-    allowed_roles = [1330289052125102201]  # Add more role IDs if needed
-    if not any(role_id in roles for role_id in allowed_roles):
+    if not any(role_id in roles for role_id in config.master_deputy_role_ids):
         await interaction.response.send_message(
             "❌ You must be a **Master Deputy** or higher to request EVOC training. ERR CODE: LASD-E-1751",
             ephemeral=True
@@ -358,12 +500,11 @@ async def training_evoc(interaction: discord.Interaction, available_time: str):
         return
 
     # Cooldown logic
-    cooldowns = load_training_cooldowns()
     user_id = str(user.id)
     now = time.time()
 
-    if user_id in cooldowns and now - cooldowns[user_id] < 3600:
-        remaining = int(3600 - (now - cooldowns[user_id]))
+    remaining = state.cooldowns.remaining(user_id, now)
+    if remaining:
         minutes = remaining // 60
         seconds = remaining % 60
         await interaction.response.send_message(
@@ -372,27 +513,21 @@ async def training_evoc(interaction: discord.Interaction, available_time: str):
         )
         return
 
+    state.cooldowns.start(user_id, now)
+
+    # Acknowledge now so slow REST calls below can't blow the 3-second window
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
     # Generate LASD-EVOCxxx ID
-    logs = load_training_logs()
-    existing_ids = load_existing_ids()
-    next_id_num = 1
-    if existing_ids:
-        id_numbers = [int(k.split("LASD-EVOC")[-1]) for k in existing_ids if k.startswith("LASD-EVOC")]
-        if id_numbers:
-            next_id_num = max(id_numbers) + 1
-
-    training_id = f"LASD-EVOC{next_id_num:03d}"
-    existing_ids.append(training_id)
-    save_existing_ids(existing_ids)
-
-    cooldowns[user_id] = now
-    save_training_cooldowns(cooldowns)
-
-    logs[training_id] = {
+    with metrics.phase("disk"):
+        training_id = await state.ids.allocate(EVOC_PREFIX)
+
+    record = {
         "username": user.name,
         "user_id": str(user.id),
         "training_type": "EVOC",
         "available_time": available_time,
+        "available_window": parse_availability(available_time, now),
         "group_status": True,
         "accepted": True,
         "message_id": None
@@ -410,15 +545,17 @@ async def training_evoc(interaction: discord.Interaction, available_time: str):
     embed.add_field(name="🆔 Training ID", value=training_id, inline=False)
     embed.set_footer(text="Submitted via /training-evoc", icon_url=user.display_avatar.url)
 
-    channel = interaction.guild.get_channel(1330460907729322014)
-    message = await interaction.channel.send(
-        content=f"<@&{PING_ROLE_ID}.>, <@{user.id}>",
-        allowed_mentions=discord.AllowedMentions(roles=True, users=True),
-        embed=embed
-    )
+    channel = resolved.training_channel
+    with metrics.phase("rest"):
+        message = await outbox.send(
+            channel,
+            f"<@&{config.staff_role_id}.>, <@{user.id}>",
+            allowed_mentions=discord.AllowedMentions(roles=True, users=True),
+            embed=embed,
+            coalesce=True
+        )
 
-    logs[training_id]["message_id"] = message.id
-    save_training_logs(logs)
+    record["message_id"] = message.id
 
     training_url = f"https://discord.com/channels/{interaction.guild.id}/{message.channel.id}/{message.id}"
     dm_embed = discord.Embed(
@@ -429,15 +566,30 @@ async def training_evoc(interaction: discord.Interaction, available_time: str):
     )
     dm_embed.set_footer(text="Thank you for your submission!")
 
+    # The confirmation DM must never go out for a request that wasn't saved
     try:
-        await user.send(embed=dm_embed)
-    except discord.Forbidden:
-        await interaction.response.send_message(
+        with metrics.phase("disk"):
+            await state.store.put(training_id, record)
+    except Exception as e:
+        logging.error(f"store failed: {e}")
+        await interaction.followup.send(f"❌ {ERRORS['LASD-E-2712']} ERR CODE: LASD-E-2712", ephemeral=True)
+        return
+    # EVOC requests are accepted as they are logged, so they only wait for their reminder
+    state.upcoming.add(training_id, record)
+
+    results = await gather_isolated(dm=metrics.timed("dm", outbox.send(user, embed=dm_embed)))
+
+    logging.info(
+        f"Training ID {training_id} submitted by {user}",
+        extra={"command": "training_evoc", "training_id": training_id, "user_id": user_id}
+    )
+    if isinstance(results["dm"], discord.Forbidden):
+        await interaction.followup.send(
             "⚠️ Request submitted, but I couldn't DM you. Please enable DMs from server members.",
             ephemeral=True
         )
     else:
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "✅ Your EVOC training request has been logged! Check your DMs for confirmation.",
             ephemeral=True
         )
@@ -450,9 +602,17 @@ async def training_evoc(interaction: discord.Interaction, available_time: str):
     training_type="The Type of traning EVOC or DST",
     side_notes="Any additional notes or comments."
 )
+@metrics.instrument
 async def training_results(interaction: discord.Interaction, trainee: str, score: str, status: str, training_type: str, side_notes: str = ""):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    resolved = guild_registry.resolve(interaction.guild)
+    config = resolved.config
+
     # Check if the user has the required role
-    required_role_id = 1330291576202727567  # The ID of the required role
+    required_role_id = config.staff_role_id
     user_roles = [role.id for role in interaction.user.roles]  # Get all roles of the user
     
     # If the user doesn't have the required role
@@ -484,38 +644,168 @@ async def training_results(interaction: discord.Interaction, trainee: str, score
     embed.set_footer(text="LASD | Training Results Logged")
 
     # Send the embed to the designated channel
-    channel = interaction.guild.get_channel(1330460924993077278)
+    channel = resolved.results_channel
     if channel:
-        await channel.send(content=f"{interaction.user.mention}, {trainee}", allowed_mentions=discord.AllowedMentions(users=True), embed=embed)
-        await interaction.response.send_message("✅ Training results have been logged successfully!", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Saved before anything is announced, so a failed write is never reported as logged
+        try:
+            with metrics.phase("disk"):
+                await state.results.add(trainee, interaction.user.id, training_type, status == "Passed", score=score, notes=side_notes)
+        except Exception as e:
+            logging.error(f"store failed: {e}")
+            await interaction.followup.send(f"❌ {ERRORS['LASD-E-2712']} ERR CODE: LASD-E-2712", ephemeral=True)
+            return
+        # Queued so a burst of results can't push the interaction past its timeout
+        outbox.post(channel, f"{interaction.user.mention}, {trainee}", allowed_mentions=discord.AllowedMentions(users=True), embed=embed, coalesce=True)
+        await interaction.followup.send("✅ Training results have been logged successfully!", ephemeral=True)
         logging.info(f"Training results for {trainee} logged by {interaction.user}.")
     else:
         await interaction.response.send_message("❌ Failed to find the designated channel for results.", ephemeral=True)
         logging.error("Failed to find the designated channel for results.")
 
+
+def _tally_text(tally):
+    return f"{tally.count} result(s) • {tally.passed} passed • {tally.pass_rate:.0%} pass rate"
+
+
+@tree.command(name="training-stats", description="Show pass rates overall, for a trainee or for a host")
+@app_commands.describe(
+    trainee="Show this trainee's totals and recent results.",
+    host="Show totals for results logged by this host."
+)
+@metrics.instrument
+async def training_stats(interaction: discord.Interaction, trainee: str = "", host: discord.Member = None):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    # The state outlives config reloads, so read the current role IDs from the registry
+    config = guild_registry.get(interaction.guild_id)
+
+    if not any(role.id == config.staff_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("❌ You don't have permission to view training stats.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to use /training-stats without the required role.")
+        return
+
+    results = state.results
+    embed = discord.Embed(title="📊 Training Stats", color=discord.Color.dark_blue())
+    if trainee:
+        tally = results.trainee_tally(trainee)
+        if tally is None:
+            await interaction.response.send_message(f"❌ No results have been logged for **{trainee}**.", ephemeral=True)
+            return
+        embed.description = f"**{trainee}**: {_tally_text(tally)}"
+        for result in results.history(trainee):
+            embed.add_field(
+                name=_truncate(f"{'✅' if result['passed'] else '❌'} {result['training_type']} • Score {result['score']}", 256),
+                value=_truncate(f"<t:{int(result['logged_at'])}:d> • Host <@{result['host_id']}>\n{result['notes'] or 'No additional notes.'}"),
+                inline=False
+            )
+    elif host is not None:
+        tally = results.by_host.get(host.id)
+        embed.description = f"{host.mention}: {_tally_text(tally) if tally else 'No results logged yet.'}"
+    else:
+        embed.description = f"All results: {_tally_text(results.overall)}"
+        for training_type, tally in sorted(results.by_type.items()):
+            embed.add_field(name=f"📚 {training_type}", value=_tally_text(tally), inline=False)
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@tree.command(name="training-leaderboard", description="Rank hosts or trainees by results logged or pass rate")
+@app_commands.describe(
+    by="Rank hosts or trainees.",
+    order="Sort by number of results or by pass rate.",
+    min_results="Leave out anyone with fewer results than this."
+)
+@app_commands.choices(
+    by=[
+        app_commands.Choice(name="Hosts", value="host"),
+        app_commands.Choice(name="Trainees", value="trainee")
+    ],
+    order=[
+        app_commands.Choice(name="Results logged", value="count"),
+        app_commands.Choice(name="Pass rate", value="pass_rate")
+    ]
+)
+@metrics.instrument
+async def training_leaderboard(interaction: discord.Interaction, by: str = "host", order: str = "count", min_results: int = 1):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    # The state outlives config reloads, so read the current role IDs from the registry
+    config = guild_registry.get(interaction.guild_id)
+
+    if not any(role.id == config.staff_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("❌ You don't have permission to view the leaderboard.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to use /training-leaderboard without the required role.")
+        return
+
+    results = state.results
+    lines = []
+    for rank, (key, tally) in enumerate(results.leaderboard(by, order, min_count=min_results), start=1):
+        name = f"<@{key}>" if by == "host" else results.display_name(key)
+        lines.append(f"**{rank}.** {name} — {_tally_text(tally)}")
+
+    embed = discord.Embed(
+        title=f"🏆 {'Host' if by == 'host' else 'Trainee'} Leaderboard",
+        description="\n".join(lines) or "No results have been logged yet.",
+        color=discord.Color.gold()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def accepted_dm_embed() -> discord.Embed:
+    return discord.Embed(
+        title="✅ Training Request Accepted!",
+        description=(
+            "Your training request has been accepted! 🎉\n\n"
+            "Please get ready for your training session. Here are a few things you should prepare:\n\n"
+            "• **Prepare necessary materials** 📚\n"
+            "• **Be on time and ready to participate** ⏰\n"
+            "• **Be in the briefing room** 🏢\n"
+            "• **Follow any further instructions from the training coordinator** 📋\n\n"
+            "Good luck with your training, and make sure to give it your best! 💪"
+        ),
+        color=discord.Color.green()
+    )
+
 @tree.command(name="training_accept", description="Accept a training submission by ID")
 @app_commands.describe(training_id="Enter the training ID to accept.")
+@metrics.instrument
 async def training_accept(interaction: discord.Interaction, training_id: str):
-    if not any(role.id == 1330291576202727567 for role in interaction.user.roles):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    resolved = guild_registry.resolve(interaction.guild)
+    config = resolved.config
+
+    if not any(role.id == config.staff_role_id for role in interaction.user.roles):
         await interaction.response.send_message("❌ You don't have permission to accept training submissions.", ephemeral=True)
         logging.warning(f"{interaction.user} tried to accept a training without permission.")
         return
 
-    logs = load_training_logs()
-    if training_id not in logs:
+    with metrics.phase("disk"):
+        training_data = await state.store.get(training_id)
+    if training_data is None:
         await interaction.response.send_message(f"❌ No training log found for ID {training_id}.", ephemeral=True)
         logging.warning(f"Training ID not found: {training_id}")
         return
 
-    training_data = logs[training_id]
-    if training_data['accepted'] == 'true':
+    if is_accepted(training_data):
         await interaction.response.send_message(f"❌ Training ID {training_id} has already been accepted.", ephemeral=True)
         return
 
-    training_data['accepted'] = 'true'
-    save_training_logs(logs)
+    with metrics.phase("disk"):
+        await state.store.update(training_id, accepted=True)
+    state.pending.discard(training_id)
+    state.upcoming.add(training_id, training_data)
 
-    logging.info(f"Training ID {training_id} accepted by {interaction.user}")
+    logging.info(
+        f"Training ID {training_id} accepted by {interaction.user}",
+        extra={"command": "training_accept", "training_id": training_id, "user_id": training_data["user_id"]}
+    )
 
     embed = discord.Embed(
         title="✅ Training Accepted",
@@ -525,77 +815,380 @@ async def training_accept(interaction: discord.Interaction, training_id: str):
     embed.add_field(name="Training accepted", value="Training acceptance confirmed.")
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    user_to_notify = await interaction.guild.fetch_member(int(training_data["user_id"]))
-    if user_to_notify:
-        dm_embed = discord.Embed(
-            title="✅ Training Request Accepted!",
-            description=(
-                "Your training request has been accepted! 🎉\n\n"
-                "Please get ready for your training session. Here are a few things you should prepare:\n\n"
-                "• **Prepare necessary materials** 📚\n"
-                "• **Be on time and ready to participate** ⏰\n"
-                "• **Be in the briefing room** 🏢\n"
-                "• **Follow any further instructions from the training coordinator** 📋\n\n"
-                "Good luck with your training, and make sure to give it your best! 💪"
-            ),
-            color=discord.Color.green()
-        )
-        await user_to_notify.send(embed=dm_embed)
-
-        channel = interaction.guild.get_channel(1330460907729322014)
-        notify_embed = discord.Embed(
-            title="🚨 Training Request Accepted!",
-            description=(
-                f"<@{training_data['user_id']}>, your training request has been **accepted**!\n\n"
-                "📩 Please check your **DMs** for instructions on how to get ready for your session."
-            ),
-            color=discord.Color.green()
+    dm_embed = accepted_dm_embed()
+
+    channel = resolved.training_channel
+    notify_embed = discord.Embed(
+        title="🚨 Training Request Accepted!",
+        description=(
+            f"<@{training_data['user_id']}>, your training request has been **accepted**!\n\n"
+            "📩 Please check your **DMs** for instructions on how to get ready for your session."
+        ),
+        color=discord.Color.green()
+    )
+    notify_embed.set_footer(text="LASD Training Unit")
+
+    async def notify_trainee():
+        with metrics.phase("rest"):
+            user_to_notify = await member_resolver.resolve(interaction.guild, training_data["user_id"])
+        with metrics.phase("dm"):
+            await outbox.send(user_to_notify, embed=dm_embed)
+
+    # The DM and the channel notice don't depend on each other, so send both at once
+    results = await gather_isolated(
+        dm=notify_trainee(),
+        notice=metrics.timed("rest", outbox.send(channel, embed=notify_embed, coalesce=True))
+    )
+
+    if isinstance(results["dm"], discord.NotFound):
+        logging.error(f"User with ID {training_data['user_id']} not found.")
+        await interaction.followup.send(f"❌ The user with ID {training_data['user_id']} was not found or is not in the server.", ephemeral=True)
+
+@tree.command(name="training_accept_bulk", description="Accept several training submissions at once")
+@app_commands.describe(
+    training_ids="IDs and ranges, e.g. LASD-DST001, LASD-DST005..LASD-DST012",
+    pending_type="Accept every pending training of this type instead"
+)
+@app_commands.choices(pending_type=[
+    app_commands.Choice(name="DST", value="DST"),
+    app_commands.Choice(name="EVOC", value="EVOC")
+])
+@metrics.instrument
+async def training_accept_bulk(interaction: discord.Interaction, training_ids: str = "", pending_type: str = ""):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    resolved = guild_registry.resolve(interaction.guild)
+    config = resolved.config
+
+    if not any(role.id == config.staff_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("❌ You don't have permission to accept training submissions.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to bulk accept trainings without permission.")
+        return
+
+    if bool(training_ids) == bool(pending_type):
+        await interaction.response.send_message("❌ Give either a list of training IDs or a pending type, not both.", ephemeral=True)
+        return
+
+    try:
+        requested_ids = parse_training_ids(training_ids)
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    with metrics.phase("disk"):
+        if pending_type:
+            pending = await state.store.find(training_type=pending_type, accepted=False)
+        else:
+            found = await asyncio.gather(*(state.store.get(training_id) for training_id in requested_ids))
+            pending = {
+                training_id: record
+                for training_id, record in zip(requested_ids, found)
+                if record is not None and not is_accepted(record)
+            }
+    skipped = [training_id for training_id in requested_ids if training_id not in pending]
+
+    if not pending:
+        await interaction.followup.send("ℹ️ No pending trainings matched.", ephemeral=True)
+        return
+
+    # Every status change lands in one store write
+    with metrics.phase("disk"):
+        await state.store.update_many({training_id: {"accepted": True} for training_id in pending})
+    for training_id, record in pending.items():
+        state.pending.discard(training_id)
+        state.upcoming.add(training_id, record)
+    logging.info(f"{len(pending)} training(s) bulk accepted by {interaction.user}: {', '.join(pending)}")
+
+    dm_embed = accepted_dm_embed()
+    dm_slots = asyncio.Semaphore(BULK_DM_CONCURRENCY)
+
+    async def notify_trainee(record):
+        async with dm_slots:
+            with metrics.phase("rest"):
+                member = await member_resolver.resolve(interaction.guild, record["user_id"])
+            with metrics.phase("dm"):
+                await outbox.send(member, embed=dm_embed)
+
+    results = await gather_isolated(**{
+        training_id: notify_trainee(record) for training_id, record in pending.items()
+    })
+    undelivered = [training_id for training_id, result in results.items() if isinstance(result, Exception)]
+
+    trainees = sorted({f"<@{record['user_id']}>" for record in pending.values()})
+    summary_embed = discord.Embed(
+        title="🚨 Training Requests Accepted!",
+        description=(
+            f"{len(pending)} training request(s) have been **accepted**!\n\n"
+            "📩 Please check your **DMs** for instructions on how to get ready for your session."
+        ),
+        color=discord.Color.green()
+    )
+    summary_embed.add_field(name="👥 Trainees", value=_truncate(", ".join(trainees)), inline=False)
+    summary_embed.add_field(name="🆔 Training IDs", value=_truncate(", ".join(pending)), inline=False)
+    summary_embed.set_footer(text="LASD Training Unit")
+
+    channel = resolved.training_channel
+    with metrics.phase("rest"):
+        await outbox.send(
+            channel,
+            " ".join(trainees) if len(trainees) <= BULK_MENTION_LIMIT else None,
+            allowed_mentions=discord.AllowedMentions(users=True),
+            embed=summary_embed
         )
-        notify_embed.set_footer(text="LASD Training Unit")
-        await channel.send(embed=notify_embed)
+
+    report = discord.Embed(
+        title="✅ Trainings Accepted",
+        description=f"Accepted {len(pending)} training(s).",
+        color=discord.Color.green()
+    )
+    if skipped:
+        report.add_field(name="⏭️ Skipped (missing or already accepted)", value=_truncate(", ".join(skipped)), inline=False)
+    if undelivered:
+        report.add_field(name="⚠️ DM not delivered", value=_truncate(", ".join(undelivered)), inline=False)
+    await interaction.followup.send(embed=report, ephemeral=True)
+
+
+def _truncate(text, limit=1024):
+    # Embed field values are capped at 1024 characters
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+@tree.command(name="training-schedule", description="Group pending trainings into as few sessions as possible")
+@app_commands.describe(
+    training_type="Only schedule this training type.",
+    max_group="Most trainees per session (0 for no limit)."
+)
+@app_commands.choices(training_type=[
+    app_commands.Choice(name="DST", value="DST"),
+    app_commands.Choice(name="EVOC", value="EVOC")
+])
+@metrics.instrument
+async def training_schedule(interaction: discord.Interaction, training_type: str = "", max_group: int = 0):
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+    # The state outlives config reloads, so read the current role IDs from the registry
+    config = guild_registry.get(interaction.guild_id)
+
+    if not any(role.id == config.staff_role_id for role in interaction.user.roles):
+        await interaction.response.send_message("❌ You don't have permission to schedule trainings.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to use /training-schedule without the required role.")
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    # The index is already sorted by window end, so skipping the ones that have passed is a bisect
+    now = time.time()
+    types = (training_type,) if training_type else ("DST", "EVOC")
+    if training_type:
+        expired = sum(record.get("training_type") == training_type for _, record, _ in state.pending.items(until=(now,)))
     else:
-        logging.error(f"User with ID {training_data['user_id']} not found.")
-        await interaction.response.send_message(f"❌ The user with ID {training_data['user_id']} was not found or is not in the server.", ephemeral=True)
+        expired = state.pending.position((now,))
+    windows, too_short, mentions = [], 0, {}
+    for training_id, record, window in state.pending.items(since=(now,)):
+        if record.get("training_type") not in types:
+            continue
+        start = max(window[0], now)
+        if window[1] - start < TRAINING_SESSION_SECONDS:
+            too_short += 1
+            continue
+        windows.append((training_id, record.get("training_type"), start, window[1]))
+        mentions[training_id] = record.get("user_id")
+    unparsed = [training_id for training_id, record in state.pending.unparsed.items() if record.get("training_type") in types]
+
+    sessions = plan_sessions(windows, TRAINING_SESSION_SECONDS, capacity=max_group or None)
+    embed = discord.Embed(
+        title="🗓️ Training Schedule",
+        description=f"{len(windows)} pending training(s) in {len(sessions)} session(s).",
+        color=discord.Color.dark_blue()
+    )
+    # Embeds are capped at 25 fields
+    for number, session in enumerate(sessions[:24], start=1):
+        trainees = "\n".join(f"{training_id} <@{mentions[training_id]}>" for training_id in session.training_ids)
+        embed.add_field(
+            name=f"📅 Session {number} • {session.training_type} • {len(session.training_ids)} trainee(s)",
+            value=_truncate(f"<t:{int(session.start)}:F> (<t:{int(session.start)}:R>)\n{trainees}"),
+            inline=False
+        )
+    if len(sessions) > 24:
+        embed.set_footer(text=f"{len(sessions) - 24} more session(s) not shown")
+
+    notes = []
+    if unparsed:
+        notes.append(f"Couldn't read the availability for: {', '.join(unparsed)}")
+    if expired:
+        notes.append(f"{expired} request(s) whose availability has already passed were left out.")
+    if too_short:
+        notes.append(f"{too_short} request(s) with less than {TRAINING_SESSION_SECONDS // 60} minutes of availability left were left out.")
+    if notes:
+        embed.add_field(name="⚠️ Needs a manual look", value=_truncate("\n".join(notes)), inline=False)
+
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 @tree.command(name="devmode", description="Toggle development mode (maintenance mode)")
+@metrics.instrument
 async def devmode(interaction: discord.Interaction):
     if interaction.user.id != YOUR_DISCORD_USER_ID:
         await interaction.response.send_message("❌ You don't have permission to toggle dev mode.", ephemeral=True)
         logging.warning(f"{interaction.user} tried to toggle dev mode without permission.")
         return
 
-    # Load current maintenance mode status
-    maintenance_active = False
-    if os.path.exists(MAINTENANCE_FILE):
-        try:
-            with open(MAINTENANCE_FILE, "r") as f:
-                data = json.load(f)
-                maintenance_active = data.get("maintenance", False)
-        except Exception as e:
-            logging.error(f"Error reading maintenance file: {e}")
+    global maintenance_active
+    maintenance_active = not maintenance_active
+    await bot.change_presence(**presence_options())
 
-    if maintenance_active:
+    if not maintenance_active:
         # Disable maintenance mode
-        os.remove(MAINTENANCE_FILE)
-        await bot.change_presence(
-            status=discord.Status.online,
-            activity=discord.Activity(type=discord.ActivityType.watching, name="Trainings")
-        )
+        await persistence.remove_file(MAINTENANCE_FILE)
         logging.info(f"Bot exited maintenance mode by {interaction.user}")
         await interaction.response.send_message("✅ Bot is now out of maintenance mode.", ephemeral=False)
     else:
         # Enable maintenance mode
-        with open(MAINTENANCE_FILE, "w") as f:
-            json.dump({"maintenance": True}, f)
-
-        await bot.change_presence(
-            status=discord.Status.dnd,
-            activity=discord.Game(name="Down for maintenance")
-        )
+        await persistence.write_json(MAINTENANCE_FILE, {"maintenance": True})
         logging.info(f"Bot entered maintenance mode by {interaction.user}")
         await interaction.response.send_message("🔧 Bot is now in maintenance mode (Dev Mode).", ephemeral=False)
 
+@tree.command(name="reload-config", description="Reload guilds.json without restarting (Admin only)")
+@metrics.instrument
+async def reload_config(interaction: discord.Interaction):
+    if interaction.user.id != YOUR_DISCORD_USER_ID:
+        await interaction.response.send_message("❌ You don't have permission to reload the config.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to reload the config without permission.")
+        return
+
+    # Opening stores for newly added guilds can outlast the 3 second response window
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    registry = await reload_guild_config()
+    if registry is None:
+        await interaction.followup.send(f"❌ {GUILD_CONFIG_FILE} is invalid, the current config was kept. See the logs.", ephemeral=True)
+        return
+
+    logging.info(f"Guild config reloaded by {interaction.user}")
+    await interaction.followup.send(f"✅ Reloaded config for {len(registry.guilds)} guild(s).", ephemeral=True)
+
+@tree.command(name="training-export", description="Export training logs or results as a gzipped file (Admin only)")
+@app_commands.describe(
+    dataset="Submitted trainings or logged results.",
+    file_format="CSV or JSON Lines.",
+    since="First day to include, YYYY-MM-DD (UTC).",
+    until="Last day to include, YYYY-MM-DD (UTC).",
+    training_type="Only this training type.",
+    status="Accepted/Pending/Expired for trainings, Passed/Failed for results."
+)
+@app_commands.choices(
+    dataset=[
+        app_commands.Choice(name="Trainings", value="trainings"),
+        app_commands.Choice(name="Results", value="results")
+    ],
+    file_format=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="JSONL", value="jsonl")
+    ],
+    training_type=[
+        app_commands.Choice(name="DST", value="DST"),
+        app_commands.Choice(name="EVOC", value="EVOC")
+    ],
+    status=[
+        app_commands.Choice(name="Accepted", value="accepted"),
+        app_commands.Choice(name="Pending", value="pending"),
+        app_commands.Choice(name="Expired", value="expired"),
+        app_commands.Choice(name="Passed", value="passed"),
+        app_commands.Choice(name="Failed", value="failed")
+    ]
+)
+@metrics.instrument
+async def training_export(interaction: discord.Interaction, dataset: str = "trainings", file_format: str = "csv",
+                          since: str = "", until: str = "", training_type: str = "", status: str = ""):
+    if interaction.user.id != YOUR_DISCORD_USER_ID:
+        await interaction.response.send_message("❌ You don't have permission to export training data.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to export training data without permission.")
+        return
+
+    state = guild_states.get(interaction.guild_id)
+    if state is None:
+        await reply_not_configured(interaction)
+        return
+
+    try:
+        since_ts = parse_date(since) if since else None
+        until_ts = parse_date(until, end=True) if until else None
+    except ValueError:
+        await interaction.response.send_message("❌ Dates must look like 2025-01-31.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    filename = export_filename(dataset, file_format)
+    path = os.path.join(state.config.data_dir, EXPORT_DIR, filename)
+    await persistence.run_io(lambda: os.makedirs(os.path.dirname(path), exist_ok=True))
+    try:
+        with metrics.phase("disk"):
+            written = await export_history(
+                path,
+                state.results if dataset == "results" else state.store,
+                dataset=dataset,
+                fmt=file_format,
+                since=since_ts,
+                until=until_ts,
+                training_type=training_type or None,
+                status=status or None
+            )
+    except ValueError as e:
+        await persistence.remove_file(path)
+        await interaction.followup.send(f"❌ {e}", ephemeral=True)
+        return
+
+    logging.info(f"{interaction.user} exported {written} {dataset} row(s) to {path}")
+    size = (await persistence.run_io(os.stat, path)).st_size
+    if size > interaction.guild.filesize_limit:
+        # Too big to attach, so leave it on disk for someone to collect
+        await interaction.followup.send(f"📦 Exported {written} row(s), but the file is too large to attach. It was saved as `{path}`.", ephemeral=True)
+        return
+
+    with metrics.phase("rest"):
+        await interaction.followup.send(f"📦 Exported {written} row(s).", file=discord.File(path, filename=filename), ephemeral=True)
+    await persistence.remove_file(path)
+
+@tree.command(name="stats", description="Show command latency and error rates (Admin only)")
+@app_commands.describe(dump="Also write Prometheus-format metrics to disk")
+@metrics.instrument
+async def stats(interaction: discord.Interaction, dump: bool = False):
+    if interaction.user.id != YOUR_DISCORD_USER_ID:
+        await interaction.response.send_message("❌ You don't have permission to view bot stats.", ephemeral=True)
+        logging.warning(f"{interaction.user} tried to view stats without permission.")
+        return
+
+    uptime = time.time() - metrics.started_at
+    embed = discord.Embed(
+        title="📈 LASD Bot Stats",
+        description=(f"Uptime {uptime / 3600:.1f}h • Gateway latency {bot.latency * 1000:.0f}ms\n"
+                     f"Startup {startup_seconds or 0:.2f}s • {INTENT_PROFILE} intents • "
+                     f"{sum(guild.member_count or 0 for guild in bot.guilds)} member(s), "
+                     f"{len(bot.users)} cached"),
+        color=discord.Color.dark_blue()
+    )
+    # Embeds are capped at 25 fields
+    for name, calls, errors, p50, p99 in metrics.summary()[:25]:
+        embed.add_field(
+            name=f"🔹 {name}",
+            value=(f"{calls} call(s) • {calls / uptime * 60:.2f}/min • {errors} error(s)\n"
+                   f"p50 ≤ {p50 * 1000:.0f}ms • p99 ≤ {p99 * 1000:.0f}ms"),
+            inline=False
+        )
+    if not embed.fields:
+        embed.add_field(name="No data", value="No commands have run since startup.", inline=False)
+
+    if dump:
+        await persistence.write_text(METRICS_FILE, metrics.render_prometheus())
+        embed.set_footer(text=f"Metrics written to {METRICS_FILE}")
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 @tree.command(name="restart", description="Restart the bot and update all packages (Admin only)")
+@metrics.instrument
 async def restart(interaction: discord.Interaction):
     if interaction.user.id != YOUR_DISCORD_USER_ID:
         embed = discord.Embed(
@@ -607,92 +1200,118 @@ async def restart(interaction: discord.Interaction):
         logging.warning(f"Unauthorized restart attempt by {interaction.user}")
         return
 
+    if restart_lock.locked():
+        await interaction.response.send_message("⏳ A restart is already in progress.", ephemeral=True)
+        return
+
     await interaction.response.defer(ephemeral=False, thinking=True)
     logging.info(f"Bot update and restart initiated by {interaction.user}")
 
-    try:
-        start_time = time.perf_counter()
-
-        # Upgrade pip
-        pip_start = time.perf_counter()
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], check=True)
-        pip_duration = time.perf_counter() - pip_start
-
-        # Freeze and parse
-        freeze_start = time.perf_counter()
-        installed_packages = subprocess.check_output([sys.executable, "-m", "pip", "freeze"]).decode().splitlines()
-        package_names = [pkg.split('==')[0] for pkg in installed_packages]
-        freeze_duration = time.perf_counter() - freeze_start
-
-        # Upgrade all packages
-        upgrade_start = time.perf_counter()
-        if package_names:
-            subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade"] + package_names, check=True)
-        upgrade_duration = time.perf_counter() - upgrade_start
+    async with restart_lock:
+        progress_message = await interaction.followup.send("♻️ Starting package upgrade...", wait=True)
+        last_edit = 0.0
+
+        async def on_progress(line):
+            # Edit at most every couple of seconds to stay clear of the message rate limit
+            nonlocal last_edit
+            now = time.monotonic()
+            if not line or now - last_edit < RESTART_PROGRESS_INTERVAL:
+                return
+            last_edit = now
+            try:
+                await progress_message.edit(content=f"♻️ Upgrading...\n```{line[-1800:]}```")
+            except discord.HTTPException as e:
+                logging.warning(f"Failed to update restart progress: {e}")
 
-        total_duration = time.perf_counter() - start_time
-        eta = round(total_duration + 5)  # Buffer for restart
-
-        embed = discord.Embed(
-            title="♻️ Restarting Bot",
-            description="✅ All packages have been updated. Restarting now...",
-            color=discord.Color.green()
-        )
-        embed.add_field(name="📦 pip Upgrade Time", value=f"{pip_duration:.2f} seconds", inline=True)
-        embed.add_field(name="📋 Freeze Parse Time", value=f"{freeze_duration:.2f} seconds", inline=True)
-        embed.add_field(name="🔄 Packages Upgrade Time", value=f"{upgrade_duration:.2f} seconds", inline=True)
-        embed.add_field(name="⏱️ Total Time", value=f"{total_duration:.2f} seconds", inline=True)
-        embed.add_field(name="🕒 Estimated Restart Time", value=f"{eta} seconds", inline=False)
-        embed.set_footer(text=f"Initiated by {interaction.user}", icon_url=interaction.user.display_avatar.url)
+        try:
+            timings, upgraded = await upgrade_packages(on_progress)
+            eta = 5  # Only the execv handoff is left
+
+            embed = discord.Embed(
+                title="♻️ Restarting Bot",
+                description=(
+                    f"✅ Upgraded {len(upgraded)} outdated package(s). Restarting now..."
+                    if upgraded else "✅ All packages are up to date. Restarting now..."
+                ),
+                color=discord.Color.green()
+            )
+            embed.add_field(name="📦 pip Upgrade Time", value=f"{timings['pip']:.2f} seconds", inline=True)
+            embed.add_field(name="📋 Outdated Check Time", value=f"{timings['outdated']:.2f} seconds", inline=True)
+            embed.add_field(name="🔄 Packages Upgrade Time", value=f"{timings['upgrade']:.2f} seconds", inline=True)
+            embed.add_field(name="🩺 Health Check Time", value=f"{timings['health_check']:.2f} seconds", inline=True)
+            embed.add_field(name="⏱️ Total Time", value=f"{timings['total']:.2f} seconds", inline=True)
+            embed.add_field(name="🕒 Estimated Restart Time", value=f"{eta} seconds", inline=False)
+            embed.set_footer(text=f"Initiated by {interaction.user}", icon_url=interaction.user.display_avatar.url)
 
-        await interaction.followup.send(embed=embed, ephemeral=False)
-        logging.info(f"Estimated restart duration: {eta} seconds")
+            await progress_message.edit(content=None, embed=embed)
+            logging.info(f"Upgraded packages: {upgraded or 'none'}")
 
-    except Exception as e:
-        logging.error(f"Update failed: {e}")
-        error_embed = discord.Embed(
-            title="❌ Update Failed",
-            description=f"An error occurred during the update:\n```{str(e)}```",
-            color=discord.Color.red()
-        )
-        await interaction.followup.send(embed=error_embed, ephemeral=True)
-        return
+        except Exception as e:
+            logging.error(f"Update failed: {e}")
+            details = getattr(e, "output", None) or str(e)
+            error_embed = discord.Embed(
+                title="❌ Update Failed",
+                description=f"An error occurred during the update, the bot was not restarted:\n```{details[-1800:]}```",
+                color=discord.Color.red()
+            )
+            await progress_message.edit(content=None, embed=error_embed)
+            return
 
-    # Save restart info
-    with open(RESTART_INFO_FILE, "w") as f:
-        json.dump({
+        # Save restart info
+        await persistence.write_json(RESTART_INFO_FILE, {
             "user_id": interaction.user.id,
             "channel_id": interaction.channel.id
-        }, f)
-
-    await bot.close()
-    os.execv(sys.executable, [sys.executable] + sys.argv)
+        })
+
+        # Stop background jobs, then write out any debounced cooldown changes before the process is replaced
+        await scheduler.stop()
+        for state in guild_states:
+            await state.flush()
+
+        await bot.close()
+        # Drain every queued write before the files and connections under it are closed
+        persistence.shutdown()
+        for state in guild_states:
+            state.close()
+        if log_listener is not None:
+            log_listener.stop()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+RESTRICTED_WARNING_EMBED = discord.Embed(
+    title="❌ You don't have permission to send messages",
+    description="You must have the required role to send messages in this channel.",
+    color=discord.Color.red()
+)
 
 @bot.event
+@metrics.instrument
 async def on_message(message: discord.Message):
-    # Check if the message is from a bot to prevent bot-to-bot interaction
-    if message.author.bot:
+    # Fast path: almost every message is outside the restricted channels
+    if message.channel.id not in guild_registry.restricted_channel_ids or message.author.bot:
         return
 
-    # Check if the message is in the restricted channel (with ID 1330460907729322014)
-    if message.channel.id == 1330460907729322014:
-        # Check if the user has the required role to send a message
-        if "1330291576202727567" not in [role.id for role in message.author.roles]:
-            # If the user doesn't have the role, delete the message and send a warning
-            await message.delete()
+    config = guild_registry.get(message.guild.id) if message.guild else None
+    if config is None or message.channel.id != config.training_channel_id:
+        return
 
-            # Send a warning embed
-            warning_embed = discord.Embed(
-                title="❌ You don't have permission to send messages",
-                description="You must have the required role to send messages in this channel.",
-                color=discord.Color.red()
-            )
-            warning_message = await message.author.send(embed=warning_embed)
+    # Webhook and system authors have no roles
+    if any(role.id == config.staff_role_id for role in getattr(message.author, "roles", ())):
+        return
 
-            # Delete the warning embed after 5 seconds
-            await asyncio.sleep(5)
-            await warning_message.delete()
-            return  # Stop further processing
+    with metrics.phase("rest"):
+        await message.delete()
+
+    # Queued with delete_after so the handler returns instead of sleeping on every spam message
+    outbox.post(message.author, embed=RESTRICTED_WARNING_EMBED, delete_after=RESTRICTED_WARNING_SECONDS)
 
 # Run the bot
-bot.run("MTM3MDc3NzExNDMxMTI2MjMxOA.G27o-r.VDAE7xsAwqoxwANsCyRzvqknw0TNNyntFWR4eI")
+if __name__ == "__main__":
+    # Records are written by a background listener so handlers never wait on disk
+    log_listener = configure_logging(
+        "logs",
+        level=os.getenv("LASD_LOG_LEVEL", "INFO").upper(),
+        json_format=os.getenv("LASD_LOG_JSON") == "1",
+        stream=sys.stdout
+    )
+    # discord.py would otherwise add its own stderr handler, duplicating records and skipping the queue
+    bot.run("MTM3MDc3NzExNDMxMTI2MjMxOA.G27o-r.VDAE7xsAwqoxwANsCyRzvqknw0TNNyntFWR4eI", log_handler=None)
@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+
+
+class MemberResolver:
+    """Resolves guild members from the gateway cache before falling back to REST.
+
+    Members that had to be fetched are kept in a small LRU for ``ttl`` seconds,
+    so repeated lookups for the same trainee cost one API call at most.
+    """
+
+    def __init__(self, max_size=256, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._fetched = OrderedDict()
+
+    def _cached(self, key, now):
+        entry = self._fetched.get(key)
+        if entry is None:
+            return None
+        member, fetched_at = entry
+        if now - fetched_at > self.ttl:
+            del self._fetched[key]
+            return None
+        self._fetched.move_to_end(key)
+        return member
+
+    async def resolve(self, guild, user_id):
+        user_id = int(user_id)
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+
+        key = (guild.id, user_id)
+        now = time.monotonic()
+        member = self._cached(key, now)
+        if member is not None:
+            return member
+
+        member = await guild.fetch_member(user_id)
+        self._fetched[key] = (member, now)
+        self._fetched.move_to_end(key)
+        while len(self._fetched) > self.max_size:
+            self._fetched.popitem(last=False)
+        return member
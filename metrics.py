@@ -0,0 +1,153 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager
+
+# Latency bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_current_handler = contextvars.ContextVar("lasd_metrics_handler", default=None)
+# Per-call timings, only written when LASD_LOG_LEVEL=DEBUG
+_timing_log = logging.getLogger("lasd.timings")
+
+
+class Histogram:
+    """Per-bucket counts plus a running sum, cheap enough to update on every call."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+
+class Metrics:
+    """Per-handler call counts, error counts and latency histograms, split by phase."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.calls = {}
+        self.errors = {}
+        self.latency = {}
+        self.phases = {}
+
+    def instrument(self, func):
+        """Wrap a command or event coroutine so every call is timed and counted."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = _current_handler.set(name)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.calls[name] = self.calls.get(name, 0) + 1
+                self.latency.setdefault(name, Histogram()).observe(elapsed)
+                _current_handler.reset(token)
+                if _timing_log.isEnabledFor(logging.DEBUG):
+                    _timing_log.debug(
+                        f"{name} took {elapsed * 1000:.1f}ms",
+                        extra={"command": name, "latency_ms": round(elapsed * 1000, 3)}
+                    )
+
+        return wrapper
+
+    @contextmanager
+    def phase(self, phase_name):
+        """Time a block inside an instrumented handler, e.g. ``disk``, ``rest`` or ``dm``."""
+        handler = _current_handler.get()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if handler is not None:
+                key = (handler, phase_name)
+                self.phases.setdefault(key, Histogram()).observe(time.perf_counter() - start)
+
+    async def timed(self, phase_name, awaitable):
+        """Await ``awaitable`` inside ``phase``, handy for calls passed to ``asyncio.gather``."""
+        with self.phase(phase_name):
+            return await awaitable
+
+    def summary(self):
+        # Rows of (handler, calls, errors, p50, p99) sorted by call count
+        rows = []
+        for name, histogram in self.latency.items():
+            rows.append((name, self.calls.get(name, 0), self.errors.get(name, 0),
+                         histogram.quantile(0.5), histogram.quantile(0.99)))
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def render_prometheus(self):
+        lines = [
+            "# TYPE lasd_handler_calls_total counter",
+            *(f'lasd_handler_calls_total{{handler="{name}"}} {count}' for name, count in self.calls.items()),
+            "# TYPE lasd_handler_errors_total counter",
+            *(f'lasd_handler_errors_total{{handler="{name}"}} {count}' for name, count in self.errors.items()),
+            "# TYPE lasd_handler_latency_seconds histogram",
+        ]
+        for name, histogram in self.latency.items():
+            lines.extend(_render_histogram("lasd_handler_latency_seconds", f'handler="{name}"', histogram))
+        lines.append("# TYPE lasd_phase_latency_seconds histogram")
+        for (name, phase_name), histogram in self.phases.items():
+            lines.extend(_render_histogram("lasd_phase_latency_seconds", f'handler="{name}",phase="{phase_name}"', histogram))
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host="127.0.0.1", port=9464):
+        """Serve ``render_prometheus`` over plain HTTP for a local scraper."""
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+                body = self.render_prometheus().encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: text/plain; version=0.0.4\r\n"
+                    + f"Content-Length: {len(body)}\r\n".encode()
+                    + b"Connection: close\r\n\r\n"
+                    + body
+                )
+                await writer.drain()
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        logging.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        return server
+
+
+def _render_histogram(metric, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        yield f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}'
+    yield f"{metric}_sum{{{labels}}} {histogram.sum}"
+    yield f"{metric}_count{{{labels}}} {histogram.total}"
+
+
+metrics = Metrics()
@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+import logging
+
+import persistence
+from storage import migrate_json_to_sqlite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import training_logs.json into the SQLite training store")
+    parser.add_argument("--source", default="training_logs.json", help="JSON snapshot to import (its .wal is replayed too)")
+    parser.add_argument("--target", default="training_logs.db", help="SQLite database to write")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        asyncio.run(migrate_json_to_sqlite(args.source, args.target))
+    finally:
+        persistence.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import discord
+
+
+class _Bucket:
+    """Token bucket allowing ``rate`` sends per ``per`` seconds."""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+
+class _Pending:
+    __slots__ = ("content", "embed", "allowed_mentions", "delete_after", "coalesce", "future")
+
+    def __init__(self, content, embed, allowed_mentions, delete_after, coalesce, future):
+        self.content = content
+        self.embed = embed
+        self.allowed_mentions = allowed_mentions
+        self.delete_after = delete_after
+        self.coalesce = coalesce
+        self.future = future
+
+
+class Outbox:
+    """Central send queue with one worker and one rate bucket per channel or DM.
+
+    ``send`` returns a future for the sent message, ``post`` is fire-and-forget.
+    When a channel is backlogged, queued ``coalesce=True`` embeds are merged
+    into a single message of up to ``max_embeds`` embeds.
+    """
+
+    def __init__(self, channel_rate=(5, 5.0), dm_rate=(5, 5.0), max_embeds=10):
+        self.channel_rate = channel_rate
+        self.dm_rate = dm_rate
+        self.max_embeds = max_embeds
+        self._queues = {}
+        self._buckets = {}
+        self._workers = {}
+
+    @staticmethod
+    def _key(destination):
+        kind = "dm" if isinstance(destination, discord.abc.User) else "channel"
+        return kind, destination.id
+
+    def send(self, destination, content=None, *, embed=None, allowed_mentions=None, delete_after=None, coalesce=False):
+        key = self._key(destination)
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(
+            _Pending(content, embed, allowed_mentions, delete_after, coalesce and embed is not None, future)
+        )
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, destination))
+        return future
+
+    def post(self, destination, content=None, **kwargs):
+        future = self.send(destination, content, **kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"Queued message failed to send: {future.exception()}")
+
+    def pending(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next_batch(self, queue):
+        batch = [queue.popleft()]
+        if batch[0].coalesce:
+            while (queue and queue[0].coalesce and len(batch) < self.max_embeds
+                   and queue[0].delete_after == batch[0].delete_after):
+                batch.append(queue.popleft())
+        return batch
+
+    async def _drain(self, key, destination):
+        rate, per = self.dm_rate if key[0] == "dm" else self.channel_rate
+        bucket = self._buckets.setdefault(key, _Bucket(rate, per))
+        queue = self._queues[key]
+        try:
+            while queue:
+                batch = self._next_batch(queue)
+                await bucket.acquire()
+                try:
+                    if len(batch) == 1:
+                        item = batch[0]
+                        message = await destination.send(
+                            item.content,
+                            embed=item.embed,
+                            allowed_mentions=item.allowed_mentions,
+                            delete_after=item.delete_after
+                        )
+                    else:
+                        contents = [item.content for item in batch if item.content]
+                        message = await destination.send(
+                            " ".join(contents) if contents else None,
+                            embeds=[item.embed for item in batch],
+                            allowed_mentions=batch[0].allowed_mentions,
+                            delete_after=batch[0].delete_after
+                        )
+                        logging.info(f"Coalesced {len(batch)} queued messages into one for {key[0]} {key[1]}")
+                except Exception as e:
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                else:
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_result(message)
+        finally:
+            del self._workers[key]
+            if not queue:
+                del self._queues[key]
+                # DM buckets are per user, so drop them rather than keep one per trainee forever
+                if key[0] == "dm":
+                    del self._buckets[key]
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+_executors = []
+
+
+def io_executor(name="lasd-io"):
+    """A single-worker executor: one worker keeps writes to the same file in submission order.
+
+    Give independent data (e.g. each guild's files) its own executor so a
+    slow write for one never queues behind another.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    _executors.append(executor)
+    return executor
+
+
+_io_executor = io_executor()
+
+
+async def run_io(func, *args, executor=None):
+    # Run a blocking disk call on an I/O thread so the gateway heartbeat keeps ticking
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _io_executor, func, *args)
+
+
+def atomic_write_json(path, data, indent=4):
+    # Write to a temp file and swap it in so a crash never leaves a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonLines:
+    """An append-only file of JSON lines, each fsynced before the append returns.
+
+    Every method blocks, so call them through ``run_io``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def replay(self, apply):
+        """Feed every entry to ``apply`` and return how many there were.
+
+        A torn last line from a crash mid-append is cut off the file.
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        count = good_offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash mid-append, drop it and everything after
+                    logging.warning(f"Discarding partial record in {self.path}")
+                    break
+                apply(entry)
+                count += 1
+                good_offset += len(line)
+
+        if good_offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+        return count
+
+    def append(self, line):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def clear(self):
+        self.close()
+        open(self.path, "w").close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def read_json(path, default=None, executor=None):
+    return await run_io(_read_json, path, default, executor=executor)
+
+
+async def write_json(path, data, executor=None):
+    await run_io(atomic_write_json, path, data, executor=executor)
+
+
+async def write_text(path, text):
+    await run_io(_write_text, path, text)
+
+
+async def remove_file(path):
+    await run_io(_remove_file, path)
+
+
+def shutdown():
+    # Waits for queued writes; close files and connections only after this returns
+    for executor in _executors:
+        executor.shutdown(wait=True)
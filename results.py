@@ -0,0 +1,172 @@
+import array
+import asyncio
+import bisect
+import heapq
+import json
+import sys
+import time
+from collections import defaultdict
+
+from persistence import JsonLines, run_io
+
+
+class Tally:
+    """Running result and pass counts for one trainee, host or training type."""
+
+    __slots__ = ("count", "passed")
+
+    def __init__(self):
+        self.count = 0
+        self.passed = 0
+
+    def add(self, passed):
+        self.count += 1
+        self.passed += passed
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.count if self.count else 0.0
+
+
+def trainee_key(name):
+    # Trainee names are typed by hand, so "John_Doe " and "john_doe" are the same person
+    return name.strip().casefold()
+
+
+def type_key(training_type):
+    return sys.intern(training_type.strip().upper())
+
+
+class ResultsLog:
+    """Training results stored column-wise, with tallies kept up to date on insert.
+
+    Each result is one JSON line appended to ``path``. In memory every field
+    is a column indexed by row number, and per-trainee, per-host and per-type
+    tallies are updated as rows arrive, so stats and leaderboards never
+    rescan the history.
+    """
+
+    def __init__(self, path, executor=None):
+        self.path = path
+        self._executor = executor
+        self.trainees = []
+        self.hosts = array.array("q")
+        self.types = []
+        self.passed = array.array("b")
+        self.scores = []
+        self.notes = []
+        self.logged_at = array.array("d")
+
+        self.overall = Tally()
+        self.by_trainee = defaultdict(Tally)
+        self.by_host = defaultdict(Tally)
+        self.by_type = defaultdict(Tally)
+        self._trainee_rows = defaultdict(list)
+        # Rankings are rebuilt on the first query after an insert, results are logged far less often than viewed
+        self._leaderboards = {}
+        self._log = JsonLines(path)
+        self._log.replay(self._insert)
+
+    def _insert(self, entry):
+        row = len(self.passed)
+        key = trainee_key(entry["trainee"])
+        training_type = type_key(entry["training_type"])
+        passed = bool(entry["passed"])
+
+        self.trainees.append(entry["trainee"])
+        self.hosts.append(entry["host_id"])
+        self.types.append(training_type)
+        self.passed.append(passed)
+        self.scores.append(entry.get("score", ""))
+        self.notes.append(entry.get("notes", ""))
+        self.logged_at.append(entry["logged_at"])
+
+        self.overall.add(passed)
+        self.by_trainee[key].add(passed)
+        self.by_host[entry["host_id"]].add(passed)
+        self.by_type[training_type].add(passed)
+        self._trainee_rows[key].append(row)
+        self._leaderboards.clear()
+
+    def __len__(self):
+        return len(self.passed)
+
+    async def add(self, trainee, host_id, training_type, passed, score="", notes=""):
+        entry = {
+            "trainee": trainee,
+            "host_id": host_id,
+            "training_type": training_type,
+            "passed": passed,
+            "score": score,
+            "notes": notes,
+            "logged_at": time.time()
+        }
+        # Counted only once it's on disk; adds append in order, so rows still land in order
+        await run_io(self._log.append, json.dumps(entry) + "\n", executor=self._executor)
+        self._insert(entry)
+
+    def row(self, index):
+        return {
+            "trainee": self.trainees[index],
+            "host_id": self.hosts[index],
+            "training_type": self.types[index],
+            "passed": bool(self.passed[index]),
+            "score": self.scores[index],
+            "notes": self.notes[index],
+            "logged_at": self.logged_at[index]
+        }
+
+    async def scan(self, since=None, until=None, training_type=None, passed=None, page_size=1000):
+        """Yield matching result rows a page at a time, oldest first."""
+        # Rows are appended in time order, so the date range is two binary searches
+        start = bisect.bisect_left(self.logged_at, since) if since is not None else 0
+        end = bisect.bisect_left(self.logged_at, until) if until is not None else len(self)
+        training_type = type_key(training_type) if training_type else None
+        for page_start in range(start, end, page_size):
+            page = [
+                self.row(index)
+                for index in range(page_start, min(page_start + page_size, end))
+                if (training_type is None or self.types[index] == training_type)
+                and (passed is None or self.passed[index] == passed)
+            ]
+            if page:
+                yield page
+            await asyncio.sleep(0)
+
+    def trainee_tally(self, trainee):
+        return self.by_trainee.get(trainee_key(trainee))
+
+    def history(self, trainee, limit=10):
+        """The trainee's most recent results, newest first."""
+        rows = self._trainee_rows.get(trainee_key(trainee), ())
+        return [self.row(index) for index in reversed(rows[-limit:])]
+
+    def display_name(self, key):
+        # The spelling from the trainee's latest result
+        return self.trainees[self._trainee_rows[key][-1]]
+
+    def leaderboard(self, by="host", order="count", limit=10, min_count=1):
+        """Top ``limit`` (key, tally) pairs by result count or by pass rate.
+
+        Cost grows with the number of distinct hosts or trainees, not with
+        the number of results logged, and repeat queries are served from cache.
+        """
+        cache_key = (by, order, limit, min_count)
+        cached = self._leaderboards.get(cache_key)
+        if cached is not None:
+            return cached
+
+        tallies = self.by_host if by == "host" else self.by_trainee
+        if order == "pass_rate":
+            rank = lambda item: (item[1].pass_rate, item[1].count)
+        else:
+            rank = lambda item: (item[1].count, item[1].pass_rate)
+        ranked = self._leaderboards[cache_key] = heapq.nlargest(
+            limit,
+            ((key, tally) for key, tally in tallies.items() if tally.count >= min_count),
+            key=rank
+        )
+        return ranked
+
+    def close(self):
+        self._log.close()
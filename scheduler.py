@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import random
+
+
+class Scheduler:
+    """Runs coroutine jobs on fixed intervals, each in its own task.
+
+    Every wait is stretched or shrunk by up to ``jitter`` of the interval so
+    jobs started together drift apart instead of hitting disk and the API at
+    the same moment. A job never overlaps itself, and an exception is logged
+    without stopping later runs.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._tasks = []
+
+    def every(self, seconds, func, jitter=0.1):
+        self.jobs.append((seconds, func, jitter))
+        return func
+
+    def _delay(self, seconds, jitter):
+        return seconds * (1 + random.uniform(-jitter, jitter))
+
+    async def _loop(self, seconds, func, jitter):
+        while True:
+            await asyncio.sleep(self._delay(seconds, jitter))
+            try:
+                await func()
+            except Exception:
+                logging.exception(f"Scheduled job {func.__name__} failed")
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    def start(self):
+        # on_ready fires again after every reconnect
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._loop(seconds, func, jitter), name=f"job:{func.__name__}")
+            for seconds, func, jitter in self.jobs
+        ]
+        logging.info(f"Started {len(self._tasks)} scheduled job(s)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
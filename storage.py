@@ -0,0 +1,382 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+
+from persistence import JsonLines, atomic_write_json, run_io
+
+
+class TrainingStore:
+    """Training logs kept in memory, persisted as a snapshot plus an append-only WAL.
+
+    Every change is one JSON line appended to ``<snapshot>.wal``; the snapshot
+    is only rewritten when the WAL is compacted. Records are replaced rather
+    than mutated so a snapshot can be serialized off the event loop.
+    """
+
+    def __init__(self, snapshot_path, wal_path=None, compact_every=1000, executor=None):
+        self.snapshot_path = snapshot_path
+        self.wal_path = wal_path or f"{snapshot_path}.wal"
+        self.compact_every = compact_every
+        self.records = {}
+        self._wal_entries = 0
+        self._wal = JsonLines(self.wal_path)
+        self._executor = executor
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.snapshot_path, "r") as f:
+                self.records = json.load(f)
+        except FileNotFoundError:
+            logging.warning("Training log file not found, creating new log.")
+            self.records = {}
+        self._wal_entries = self._wal.replay(self._apply)
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "batch":
+            # One WAL line, so a torn write drops the whole batch rather than part of it
+            for child in entry["entries"]:
+                self._apply(child)
+            return
+        training_id = entry["id"]
+        if op == "put":
+            self.records[training_id] = entry["record"]
+        elif op == "update":
+            self.records[training_id] = {**self.records.get(training_id, {}), **entry["fields"]}
+        elif op == "delete":
+            self.records.pop(training_id, None)
+
+    def _write_snapshot(self, records):
+        atomic_write_json(self.snapshot_path, records)
+        self._wal.clear()
+
+    async def _append(self, entry):
+        # Apply in memory first so readers on the loop see the change immediately,
+        # and so a compaction snapshot taken meanwhile already holds it
+        training_ids = [child["id"] for child in entry["entries"]] if entry["op"] == "batch" else [entry["id"]]
+        before = {training_id: self.records.get(training_id) for training_id in training_ids}
+        self._apply(entry)
+        after = {training_id: self.records.get(training_id) for training_id in training_ids}
+        try:
+            await run_io(self._wal.append, json.dumps(entry) + "\n", executor=self._executor)
+        except Exception:
+            # Never on disk, so undo it, unless a later change to the same record has landed since
+            for training_id, record in before.items():
+                if self.records.get(training_id) is after[training_id]:
+                    if record is None:
+                        self.records.pop(training_id, None)
+                    else:
+                        self.records[training_id] = record
+            raise
+        self._wal_entries += 1
+        if self._wal_entries >= self.compact_every:
+            await self.compact()
+
+    def __contains__(self, training_id):
+        return training_id in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    async def get(self, training_id):
+        return self.records.get(training_id)
+
+    async def find(self, user_id=None, training_type=None, accepted=None):
+        # The JSON backend has no indexes, so this is a scan of the in-memory records
+        return {
+            training_id: record
+            for training_id, record in self.records.items()
+            if _matches(record, user_id, training_type, accepted)
+        }
+
+    def load_records(self, accepted=None):
+        # Blocking; for building indexes while the store is being opened
+        return {training_id: record for training_id, record in self.records.items() if _matches(record, None, None, accepted)}
+
+    def load_reminders(self, since):
+        # Blocking; accepted requests still owed a reminder whose window opens at or after ``since``
+        return {
+            training_id: record
+            for training_id, record in self.records.items()
+            if (remind_at(record) or 0) >= since
+        }
+
+    async def scan(self, training_type=None, accepted=None, page_size=1000):
+        """Yield matching (training_id, record) pairs a page at a time.
+
+        Walks a snapshot of the IDs and yields to the loop between pages, so a
+        full scan never holds up handlers.
+        """
+        training_ids = list(self.records)
+        for start in range(0, len(training_ids), page_size):
+            page = []
+            for training_id in training_ids[start:start + page_size]:
+                record = self.records.get(training_id)
+                if record is not None and _matches(record, None, training_type, accepted):
+                    page.append((training_id, record))
+            if page:
+                yield page
+            await asyncio.sleep(0)
+
+    async def put(self, training_id, record):
+        await self._append({"op": "put", "id": training_id, "record": record})
+
+    async def update(self, training_id, **fields):
+        await self._append({"op": "update", "id": training_id, "fields": fields})
+
+    async def update_many(self, updates):
+        await self._append({
+            "op": "batch",
+            "entries": [{"op": "update", "id": training_id, "fields": fields} for training_id, fields in updates.items()]
+        })
+
+    async def delete(self, training_id):
+        await self._append({"op": "delete", "id": training_id})
+
+    async def delete_many(self, training_ids):
+        await self._append({
+            "op": "batch",
+            "entries": [{"op": "delete", "id": training_id} for training_id in training_ids]
+        })
+
+    async def compact(self):
+        # Fold the WAL into a fresh snapshot, then start an empty WAL
+        if not self._wal_entries and os.path.exists(self.snapshot_path):
+            return
+        self._wal_entries = 0
+        await run_io(self._write_snapshot, dict(self.records), executor=self._executor)
+        logging.info("Training logs compacted successfully.")
+
+    def close(self):
+        self._wal.close()
+
+
+def is_accepted(record):
+    # Older records stored the flag as the string 'true'
+    return record.get("accepted") in (True, "true")
+
+
+def is_expired(record):
+    # Stale requests are kept for the history but no longer count as pending
+    return record.get("status") == "expired"
+
+
+def remind_at(record):
+    # When an accepted request that hasn't been reminded yet opens, else None
+    window = record.get("available_window")
+    if window and is_accepted(record) and not record.get("reminded"):
+        return window[0]
+    return None
+
+
+def _matches(record, user_id, training_type, accepted):
+    if user_id is not None and record.get("user_id") != user_id:
+        return False
+    if training_type is not None and record.get("training_type") != training_type:
+        return False
+    if accepted is not None and is_accepted(record) != accepted:
+        return False
+    if accepted is False and is_expired(record):
+        return False
+    return True
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trainings (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    training_type TEXT,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    expired INTEGER NOT NULL DEFAULT 0,
+    remind_at REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trainings_user_id ON trainings (user_id);
+CREATE INDEX IF NOT EXISTS trainings_type_accepted ON trainings (training_type, accepted);
+CREATE INDEX IF NOT EXISTS trainings_accepted ON trainings (accepted);
+"""
+
+
+class SqliteTrainingStore:
+    """Training logs in an SQLite database in WAL mode.
+
+    Exposes the same async API as ``TrainingStore``. The user, type and
+    accepted columns are indexed so ``find`` never loads the full history.
+    The connection is only used from the store's I/O thread.
+    """
+
+    def __init__(self, path, executor=None):
+        self.path = path
+        self._executor = executor
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        # Databases created before expiry kept records only ever deleted them
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(trainings)")}
+        if "expired" not in columns:
+            self._conn.execute("ALTER TABLE trainings ADD COLUMN expired INTEGER NOT NULL DEFAULT 0")
+        if "remind_at" not in columns:
+            self._conn.execute("ALTER TABLE trainings ADD COLUMN remind_at REAL")
+            self._conn.execute(
+                "UPDATE trainings SET remind_at = json_extract(data, '$.available_window[0]') "
+                "WHERE accepted = 1 AND NOT coalesce(json_extract(data, '$.reminded'), 0)"
+            )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS trainings_remind_at ON trainings (remind_at)")
+
+    @staticmethod
+    def _row(training_id, record):
+        return (
+            training_id,
+            record.get("user_id"),
+            record.get("training_type"),
+            int(is_accepted(record)),
+            int(is_expired(record)),
+            remind_at(record),
+            json.dumps(record),
+        )
+
+    def _get(self, training_id):
+        row = self._conn.execute("SELECT data FROM trainings WHERE id = ?", (training_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put_many(self, items):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trainings (id, user_id, training_type, accepted, expired, remind_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._row(training_id, record) for training_id, record in items],
+            )
+
+    def _update_many(self, updates):
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for training_id, fields in updates.items():
+                record = self._get(training_id) or {}
+                record.update(fields)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO trainings (id, user_id, training_type, accepted, expired, remind_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._row(training_id, record),
+                )
+
+    def _delete_many(self, training_ids):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM trainings WHERE id = ?", [(training_id,) for training_id in training_ids])
+
+    @staticmethod
+    def _where(user_id, training_type, accepted):
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if training_type is not None:
+            clauses.append("training_type = ?")
+            params.append(training_type)
+        if accepted is not None:
+            clauses.append("accepted = ?")
+            params.append(int(accepted))
+        if accepted is False:
+            clauses.append("expired = 0")
+        return clauses, params
+
+    def _find(self, user_id, training_type, accepted):
+        clauses, params = self._where(user_id, training_type, accepted)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(f"SELECT id, data FROM trainings{where} ORDER BY id", params)
+        return {training_id: json.loads(data) for training_id, data in rows}
+
+    def _scan_page(self, after, training_type, accepted, page_size):
+        # Keyset pagination on the primary key, so each page is an index range scan
+        clauses, params = self._where(None, training_type, accepted)
+        if after is not None:
+            clauses.append("id > ?")
+            params.append(after)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(f"SELECT id, data FROM trainings{where} ORDER BY id LIMIT ?", (*params, page_size))
+        return [(training_id, json.loads(data)) for training_id, data in rows]
+
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM trainings").fetchone()[0]
+
+    def load_records(self, accepted=None):
+        # Blocking; for building indexes while the store is being opened
+        return self._find(None, None, accepted)
+
+    def load_reminders(self, since):
+        # Blocking; accepted requests still owed a reminder whose window opens at or after ``since``
+        rows = self._conn.execute("SELECT id, data FROM trainings WHERE remind_at >= ? ORDER BY remind_at", (since,))
+        return {training_id: json.loads(data) for training_id, data in rows}
+
+    async def get(self, training_id):
+        return await run_io(self._get, training_id, executor=self._executor)
+
+    async def find(self, user_id=None, training_type=None, accepted=None):
+        return await run_io(self._find, user_id, training_type, accepted, executor=self._executor)
+
+    async def count(self):
+        return await run_io(self._count, executor=self._executor)
+
+    async def scan(self, training_type=None, accepted=None, page_size=1000):
+        """Yield matching (training_id, record) pairs a page at a time.
+
+        Each page is its own trip to the I/O thread, so writes can run in
+        between and only one page is held in memory.
+        """
+        after = None
+        while True:
+            page = await run_io(self._scan_page, after, training_type, accepted, page_size, executor=self._executor)
+            if not page:
+                return
+            yield page
+            after = page[-1][0]
+
+    async def put(self, training_id, record):
+        await run_io(self._put_many, [(training_id, record)], executor=self._executor)
+
+    async def put_many(self, items):
+        await run_io(self._put_many, list(items), executor=self._executor)
+
+    async def update(self, training_id, **fields):
+        await run_io(self._update_many, {training_id: fields}, executor=self._executor)
+
+    async def update_many(self, updates):
+        await run_io(self._update_many, dict(updates), executor=self._executor)
+
+    async def delete(self, training_id):
+        await run_io(self._delete_many, [training_id], executor=self._executor)
+
+    async def delete_many(self, training_ids):
+        await run_io(self._delete_many, list(training_ids), executor=self._executor)
+
+    async def compact(self):
+        # Fold the SQLite WAL back into the main database file
+        await run_io(self._conn.execute, "PRAGMA wal_checkpoint(TRUNCATE)", executor=self._executor)
+        logging.info("Training database checkpointed successfully.")
+
+    def close(self):
+        self._conn.close()
+
+
+def open_training_store(backend, path, executor=None):
+    if backend == "json":
+        return TrainingStore(path, executor=executor)
+    if backend == "sqlite":
+        return SqliteTrainingStore(path, executor=executor)
+    raise ValueError(f"Unknown training store backend: {backend}")
+
+
+async def migrate_json_to_sqlite(json_path, sqlite_path):
+    # Replays the JSON snapshot and its WAL, then copies every record in one transaction
+    source = TrainingStore(json_path)
+    target = SqliteTrainingStore(sqlite_path)
+    try:
+        await target.put_many(source.records.items())
+        logging.info(f"Migrated {len(source)} training log(s) from {json_path} to {sqlite_path}")
+        return len(source)
+    finally:
+        source.close()
+        target.close()
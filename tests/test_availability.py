@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from availability import WindowIndex, parse_availability, plan_sessions
+
+# Wednesday 2025-06-04 12:00 UTC
+REFERENCE = datetime(2025, 6, 4, 12, 0, tzinfo=timezone.utc)
+EST = timezone(timedelta(hours=-5))
+
+
+def at(day, hour, minute=0, tz=timezone.utc):
+    return datetime(2025, 6, day, hour, minute, tzinfo=tz).timestamp()
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Ranges
+    ("3-5pm", (at(4, 15), at(4, 17))),
+    ("11-1pm", (at(4, 11), at(4, 13))),
+    ("18:00 to 20:00 UTC", (at(4, 18), at(4, 20))),
+    ("free saturday 3-5pm", (at(7, 15), at(7, 17))),
+    ("I am free from 7 to 9pm est", (at(4, 19, tz=EST), at(4, 21, tz=EST))),
+    # Open-ended
+    ("free after 5pm", (at(4, 17), at(5, 0))),
+    ("any time after 6pm", (at(4, 18), at(5, 0))),
+    ("now until 9pm", (at(4, 12), at(4, 21))),
+    ("in 2 hours", (at(4, 14), at(4, 16))),
+    # Single times, rolled to tomorrow once past
+    ("5pm EST", (at(4, 17, tz=EST), at(4, 19, tz=EST))),
+    ("10am", (at(5, 10), at(5, 12))),
+    ("tomorrow 10am", (at(5, 10), at(5, 12))),
+    # Days and open words without a time
+    ("free saturday", (at(7, 0), at(8, 0))),
+    ("free today", (at(4, 12), at(5, 0))),
+    ("Now", (at(4, 12), at(5, 12))),
+    ("whenever", (at(4, 12), at(5, 12))),
+    # Bare hours could be am or pm
+    ("available at 2", None),
+    ("between 8 and 10pm", None),
+    ("3-5", None),
+    ("until 9", None),
+    # Nothing to go on
+    ("", None),
+    ("ask me later", None),
+])
+def test_parse_availability(text, expected):
+    assert parse_availability(text, REFERENCE.timestamp()) == expected
+
+
+@pytest.mark.parametrize("windows, expected", [
+    # Overlapping by at least the session length share one session
+    ([("A", "DST", 0, 7200), ("B", "DST", 3600, 9000)], [(3600, ["A", "B"])]),
+    # Windows that only touch can't hold a session together
+    ([("A", "DST", 0, 3600), ("B", "DST", 3600, 7200)], [(0, ["A"]), (3600, ["B"])]),
+    # Too short to fit a session at all
+    ([("A", "DST", 0, 1800)], []),
+    # Types never mix
+    ([("A", "DST", 0, 7200), ("B", "EVOC", 0, 7200)], [(0, ["A"]), (0, ["B"])]),
+])
+def test_plan_sessions(windows, expected):
+    sessions = plan_sessions(windows, 3600)
+    assert [(session.start, session.training_ids) for session in sessions] == expected
+    assert all(session.end == session.start + 3600 for session in sessions)
+
+
+def test_window_index_keeps_order():
+    index = WindowIndex(key=lambda window: (window[1], window[0]))
+    for training_id, end in (("A", 30), ("B", 10), ("C", 20), ("D", 20)):
+        index.add(training_id, {}, (0, end))
+    index.add("E", {"available_time": "maybe"})
+    index.discard("C")
+
+    assert [training_id for training_id, _, _ in index.items()] == ["B", "D", "A"]
+    assert [training_id for training_id, _, _ in index.items(since=(15,), until=(30,))] == ["D"]
+    assert list(index.unparsed) == ["E"]
+    assert len(index) == 4
+
+
+def test_window_index_build_matches_adding_one_by_one():
+    records = [(f"T{n}", {"available_window": [n % 7, n % 5 + 10]}) for n in range(50)]
+    records.append(("U", {"available_time": "maybe"}))
+    key = lambda window: (window[1], window[0])
+
+    added = WindowIndex(key)
+    for training_id, record in records:
+        added.add(training_id, record)
+    built = WindowIndex.build(key, records)
+
+    assert [item[0] for item in built.items()] == [item[0] for item in added.items()]
+    assert list(built.unparsed) == ["U"]
+    built.discard("T3")
+    assert "T3" not in built and len(built) == 50
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import pytest
+
+from ids import TrainingIdAllocator, parse_training_ids
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("LASD-DST001", ["LASD-DST001"]),
+    ("lasd-dst001, LASD-DST002  LASD-DST001", ["LASD-DST001", "LASD-DST002"]),
+    ("LASD-DST008..LASD-DST010", ["LASD-DST008", "LASD-DST009", "LASD-DST010"]),
+    ("LASD-DST098..100", ["LASD-DST098", "LASD-DST099", "LASD-DST100"]),
+    ("LASD-EVOC001..1, LASD-DST005", ["LASD-EVOC001", "LASD-DST005"]),
+    ("", []),
+])
+def test_parse_training_ids(text, expected):
+    assert parse_training_ids(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "LASD-DST005..LASD-DST001",
+    "LASD-DST001..LASD-EVOC003",
+    "LASD-DST001..abc",
+    "NOPE001..5",
+    "LASD-DST001..LASD-DST501",
+])
+def test_parse_training_ids_rejects_bad_ranges(text):
+    with pytest.raises(ValueError):
+        parse_training_ids(text)
+
+
+def test_allocator_migrates_legacy_ids(tmp_path):
+    legacy = tmp_path / "training_ids.json"
+    legacy.write_text(json.dumps({"ids": ["LASD-DST002", "LASD-DST010", "LASD-EVOC004", "LASD-DST007", "junk"]}))
+    allocator = TrainingIdAllocator(str(tmp_path / "training_counters.json"), legacy_path=str(legacy))
+
+    assert allocator.counters == {"LASD-DST": 10, "LASD-EVOC": 4}
+    assert json.loads((tmp_path / "training_counters.json").read_text()) == allocator.counters
+
+
+def test_allocator_continues_from_saved_counters(tmp_path):
+    path = str(tmp_path / "training_counters.json")
+    allocator = TrainingIdAllocator(path)
+
+    async def allocate():
+        return await asyncio.gather(*(allocator.allocate("LASD-DST") for _ in range(3)))
+
+    assert sorted(asyncio.run(allocate())) == ["LASD-DST001", "LASD-DST002", "LASD-DST003"]
+    # A restart picks up where the counters left off, even if the old list is still around
+    assert asyncio.run(TrainingIdAllocator(path, legacy_path=path).allocate("LASD-DST")) == "LASD-DST004"
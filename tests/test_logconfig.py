@@ -0,0 +1,31 @@
+import logging
+import os
+
+from logconfig import SizedTimedRotatingFileHandler
+
+
+def test_size_rotation_keeps_newest_backups(tmp_path):
+    handler = SizedTimedRotatingFileHandler(str(tmp_path / "lasd.log"), max_bytes=500, backup_count=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("test_logconfig")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for n in range(300):
+            logger.warning(f"msg {n:04d} " + "x" * 40)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    backups = [name for name in os.listdir(tmp_path) if name != "lasd.log"]
+    assert len(backups) == 3
+
+    seen = []
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name) as f:
+            seen.extend(int(line.split()[1]) for line in f if line.strip())
+    # What's left must be an unbroken run of the newest records
+    seen.sort()
+    assert seen[-1] == 299
+    assert seen == list(range(seen[0], 300))
+    assert seen[0] > 250
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+
+from outbox import Outbox
+
+
+class FakeChannel:
+    def __init__(self):
+        self.id = 1
+        self.sent = []
+
+    async def send(self, content=None, *, embed=None, embeds=None, allowed_mentions=None, delete_after=None):
+        self.sent.append((content, embeds or [embed], delete_after))
+        return len(self.sent)
+
+
+def test_backlogged_embeds_coalesce_only_with_matching_delete_after():
+    channel = FakeChannel()
+
+    async def run():
+        outbox = Outbox(max_embeds=10)
+        futures = [
+            outbox.send(channel, "a", embed="e1", coalesce=True),
+            outbox.send(channel, None, embed="e2", coalesce=True),
+            outbox.send(channel, "c", embed="e3", coalesce=True),
+            outbox.send(channel, None, embed="e4", delete_after=5, coalesce=True),
+            outbox.send(channel, None, embed="e5", coalesce=False),
+            outbox.send(channel, None, embed="e6", coalesce=True),
+        ]
+        return await asyncio.gather(*futures)
+
+    messages = asyncio.run(run())
+
+    assert channel.sent == [
+        ("a c", ["e1", "e2", "e3"], None),
+        (None, ["e4"], 5),
+        (None, ["e5"], None),
+        (None, ["e6"], None),
+    ]
+    # Every caller in a coalesced batch gets the one message that carried its embed
+    assert messages == [1, 1, 1, 2, 3, 4]
+
+
+def test_coalescing_stops_at_max_embeds():
+    channel = FakeChannel()
+
+    async def run():
+        outbox = Outbox(max_embeds=2)
+        await asyncio.gather(*(outbox.send(channel, embed=f"e{n}", coalesce=True) for n in range(5)))
+
+    asyncio.run(run())
+    assert [embeds for _, embeds, _ in channel.sent] == [["e0", "e1"], ["e2", "e3"], ["e4"]]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+from storage import TrainingStore
+
+
+def test_torn_last_wal_line_is_truncated(tmp_path):
+    snapshot = tmp_path / "training_logs.json"
+    store = TrainingStore(str(snapshot))
+    asyncio.run(store.put("LASD-DST001", {"user_id": "1"}))
+    store.close()
+    wal = tmp_path / "training_logs.json.wal"
+    good = wal.read_bytes()
+    with open(wal, "ab") as f:
+        f.write(b'{"op": "put", "id": "LASD-DST002", "rec')
+
+    store = TrainingStore(str(snapshot))
+    store.close()
+
+    assert list(store.records) == ["LASD-DST001"]
+    assert wal.read_bytes() == good
+
+
+def test_batch_entry_replays_as_a_whole(tmp_path):
+    snapshot = tmp_path / "training_logs.json"
+    store = TrainingStore(str(snapshot))
+
+    async def write():
+        await store.put("LASD-DST001", {"user_id": "1", "accepted": False})
+        await store.put("LASD-DST002", {"user_id": "2", "accepted": False})
+        await store.update_many({"LASD-DST001": {"accepted": True}, "LASD-DST002": {"accepted": True}})
+        await store.delete_many(["LASD-DST002"])
+
+    asyncio.run(write())
+    store.close()
+
+    replayed = TrainingStore(str(snapshot))
+    replayed.close()
+    assert replayed.records == {"LASD-DST001": {"user_id": "1", "accepted": True}}
+    assert replayed._wal_entries == 4
+
+
+def test_failed_wal_append_is_undone(tmp_path):
+    store = TrainingStore(str(tmp_path / "training_logs.json"))
+    asyncio.run(store.put("LASD-DST001", {"user_id": "1", "accepted": False}))
+
+    def fail(line):
+        raise OSError("disk full")
+
+    store._wal.append = fail
+    with pytest.raises(OSError):
+        asyncio.run(store.put("LASD-DST002", {"user_id": "2"}))
+    with pytest.raises(OSError):
+        asyncio.run(store.update("LASD-DST001", accepted=True))
+    store.close()
+
+    assert store.records == {"LASD-DST001": {"user_id": "1", "accepted": False}}
+    assert json.loads((tmp_path / "training_logs.json.wal").read_text().strip())["id"] == "LASD-DST001"
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+async def run_pip_step(args, on_line=None, cwd=None):
+    """Run a command as an asyncio subprocess, feeding each output line to ``on_line``.
+
+    Raises ``subprocess.CalledProcessError`` on a non-zero exit, like ``check=True``.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=cwd
+    )
+    lines = []
+    async for raw in proc.stdout:
+        line = raw.decode(errors="replace").rstrip()
+        lines.append(line)
+        if on_line is not None:
+            await on_line(line)
+    returncode = await proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, args, "\n".join(lines[-20:]))
+    return "\n".join(lines)
+
+
+async def outdated_packages():
+    # One `pip list --outdated` pass instead of upgrading everything from `pip freeze`
+    args = [sys.executable, "-m", "pip", "list", "--outdated", "--format=json", "--disable-pip-version-check"]
+    # Warnings go to stderr and would break the JSON, so only stdout is parsed
+    proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, args, stdout.decode(errors="replace"), stderr.decode(errors="replace"))
+    return [pkg["name"] for pkg in json.loads(stdout.decode() or "[]")]
+
+
+async def health_check():
+    # Import the bot itself in a fresh interpreter so a broken upgrade never reaches execv;
+    # main's imports cover every module it needs without keeping a list in sync
+    await run_pip_step([sys.executable, "-c", "import main"], cwd=BOT_DIR)
+
+
+async def upgrade_packages(on_progress=None):
+    """Upgrade pip and every outdated package, then health-check a new interpreter.
+
+    ``on_progress`` is awaited with a status line as each step runs. Returns the
+    per-step durations and the list of packages that were upgraded.
+    """
+    async def report(line):
+        if on_progress is not None:
+            await on_progress(line)
+
+    timings = {}
+    start_time = time.perf_counter()
+
+    await report("Upgrading pip...")
+    step_start = time.perf_counter()
+    await run_pip_step([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], report)
+    timings["pip"] = time.perf_counter() - step_start
+
+    await report("Checking for outdated packages...")
+    step_start = time.perf_counter()
+    packages = await outdated_packages()
+    timings["outdated"] = time.perf_counter() - step_start
+
+    step_start = time.perf_counter()
+    if packages:
+        await report(f"Upgrading {len(packages)} package(s): {', '.join(packages)}")
+        await run_pip_step([sys.executable, "-m", "pip", "install", "--upgrade"] + packages, report)
+    timings["upgrade"] = time.perf_counter() - step_start
+
+    await report("Checking the new interpreter...")
+    step_start = time.perf_counter()
+    await health_check()
+    timings["health_check"] = time.perf_counter() - step_start
+
+    timings["total"] = time.perf_counter() - start_time
+    return timings, packages